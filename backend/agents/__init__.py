@@ -3,11 +3,13 @@ from .greeting_manager import greeting_manager
 from .widget_manager import widget_manager
 from .tools import (
     get_menu,
+    search_menu,
     check_availability,
     get_restaurant_hours,
     get_location_and_contact,
     find_nearby_restaurants,
-    get_special_offers
+    get_special_offers,
+    request_widget
 )
 
 __all__ = [
@@ -15,9 +17,11 @@ __all__ = [
     "greeting_manager",
     "widget_manager",
     "get_menu",
+    "search_menu",
     "check_availability", 
     "get_restaurant_hours",
     "get_location_and_contact",
     "find_nearby_restaurants",
-    "get_special_offers"
+    "get_special_offers",
+    "request_widget"
 ]
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from backend.core import get_logger, get_metrics, get_settings
+
+logger = get_logger("data_sources")
+metrics = get_metrics()
+settings = get_settings()
+
+@dataclass(frozen=True)
+class MenuItem:
+    name: str
+    category: str
+    price: float
+    description: str
+    ingredients: Tuple[str, ...]
+    allergens: Tuple[str, ...] = ()
+    dietary: Tuple[str, ...] = ()
+    price_label: Optional[str] = None
+    
+    @property
+    def display_price(self) -> str:
+        return self.price_label or f"${self.price:g}"
+
+
+MENU_CATEGORIES = ("appetizers", "mains", "desserts", "drinks")
+
+MENU_ITEMS: Tuple[MenuItem, ...] = (
+    MenuItem("Bruschetta", "appetizers", 8, "Toasted sourdough topped with tomato, basil and garlic",
+             ("sourdough", "tomato", "basil", "garlic", "olive oil"), ("gluten",), ("vegetarian", "vegan", "dairy_free")),
+    MenuItem("Calamari", "appetizers", 12, "Crispy fried squid rings with lemon aioli",
+             ("squid", "flour", "lemon", "aioli"), ("gluten", "egg", "shellfish"), ("pescatarian", "dairy_free")),
+    MenuItem("Caesar Salad", "appetizers", 10, "Romaine hearts, parmesan, croutons and classic Caesar dressing",
+             ("romaine", "parmesan", "croutons", "anchovy", "egg"), ("gluten", "dairy", "egg", "fish"), ("pescatarian",)),
+    MenuItem("Pasta Carbonara", "mains", 18, "Spaghetti with guanciale, egg yolk, pecorino and black pepper",
+             ("spaghetti", "guanciale", "egg", "pecorino", "black pepper"), ("gluten", "dairy", "egg")),
+    MenuItem("Grilled Salmon", "mains", 24, "Atlantic salmon fillet with seasonal vegetables and herb butter",
+             ("salmon", "seasonal vegetables", "herb butter", "lemon"), ("fish", "dairy"), ("pescatarian", "gluten_free")),
+    MenuItem("Ribeye Steak", "mains", 32, "12oz grilled ribeye with roasted potatoes and peppercorn sauce",
+             ("ribeye", "beef", "potatoes", "peppercorn sauce"), ("dairy",), ("gluten_free",)),
+    MenuItem("Tiramisu", "desserts", 9, "Espresso-soaked ladyfingers layered with mascarpone and cocoa",
+             ("ladyfingers", "espresso", "mascarpone", "cocoa"), ("gluten", "dairy", "egg"), ("vegetarian",)),
+    MenuItem("Chocolate Lava Cake", "desserts", 10, "Warm chocolate cake with a molten centre and vanilla ice cream",
+             ("dark chocolate", "butter", "flour", "vanilla ice cream"), ("gluten", "dairy", "egg"), ("vegetarian",)),
+    MenuItem("Panna Cotta", "desserts", 8, "Vanilla bean cream set with berry compote",
+             ("cream", "vanilla", "berries", "gelatin"), ("dairy",), ("gluten_free",)),
+    MenuItem("Wine", "drinks", 8, "Red, white and rosé by the glass from our cellar",
+             ("red wine", "white wine", "rose"), ("sulphites",), ("vegan", "gluten_free", "dairy_free"), "$8-15/glass"),
+    MenuItem("Beer", "drinks", 6, "Local draught and bottled craft beers",
+             ("lager", "ale", "barley", "hops"), ("gluten",), ("vegan", "dairy_free"), "$6-8"),
+    MenuItem("Cocktails", "drinks", 12, "Classic and signature cocktails mixed to order",
+             ("gin", "rum", "tequila", "citrus", "mint"), (), ("vegan", "gluten_free", "dairy_free"), "$12-16")
+)
+
+MENUS: Dict[str, str] = {
+    category: ", ".join(f"{item.name} ({item.display_price})" for item in MENU_ITEMS if item.category == category)
+    for category in MENU_CATEGORIES
+}
+
+HOURS = "Monday-Thursday: 11:00 AM - 10:00 PM, Friday-Saturday: 11:00 AM - 11:00 PM, Sunday: 12:00 PM - 9:00 PM"
+
+CONTACT = "123 Main Street, Downtown. Phone: (555) 123-4567. Email: info@restaurant.com"
+
+LOCATIONS: Dict[str, List[str]] = {
+    "downtown": [
+        "Main Street Location - 123 Main St (Open 11AM-11PM)",
+        "Plaza Branch - 456 Plaza Ave (Open 10AM-10PM)",
+        "Waterfront - 789 Harbor Blvd (Open 12PM-12AM)"
+    ],
+    "uptown": [
+        "Uptown Square - 321 High St (Open 11AM-10PM)",
+        "Park Avenue - 654 Park Ave (Open 11AM-11PM)"
+    ],
+    "default": [
+        "Downtown Main - 123 Main St",
+        "Plaza Branch - 456 Plaza Ave",
+        "Uptown Square - 321 High St"
+    ]
+}
+
+OFFERS = """Here are our current special offers:
+
+🎉 **Weekend Special**: 20% off all appetizers (Fri-Sun)
+🍝 **Lunch Deal**: Pasta + Drink for $15 (Mon-Fri, 11AM-3PM)
+🎂 **Birthday Month**: Free dessert with valid ID
+👨‍👩‍👧‍👦 **Family Bundle**: 4-course meal for 4 people - $89 (Save $20!)
+🥂 **Happy Hour**: 50% off drinks (Mon-Thu, 4-6PM)
+
+All offers valid at participating locations. Some restrictions apply."""
+
+MAX_ONLINE_PARTY_SIZE = 8
+
+
+class ResourcePool:
+    """Bounds concurrent access to a backing data source and records how long callers wait for a slot."""
+    
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self._semaphore = asyncio.Semaphore(size)
+        self._in_use = 0
+    
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        async with self._semaphore:
+            waited_ms = (time.perf_counter() - started) * 1000
+            metrics.increment(f"pool.{self.name}.acquired")
+            metrics.increment(f"pool.{self.name}.wait_ms", waited_ms)
+            self._in_use += 1
+            metrics.set(f"pool.{self.name}.in_use", self._in_use)
+            try:
+                yield
+            finally:
+                self._in_use -= 1
+                metrics.set(f"pool.{self.name}.in_use", self._in_use)
+
+
+class RestaurantDataSource:
+    """Async access to restaurant data; every read goes through the shared pool, like a DB or HTTP client would."""
+    
+    def __init__(self, pool: ResourcePool):
+        self.pool = pool
+    
+    async def menu(self, category: str) -> str:
+        async with self.pool.acquire():
+            return MENUS.get(category.lower(), "Category not found. Available: appetizers, mains, desserts, drinks")
+    
+    async def hours(self) -> str:
+        async with self.pool.acquire():
+            return HOURS
+    
+    async def contact(self) -> str:
+        async with self.pool.acquire():
+            return CONTACT
+    
+    async def locations(self, location: str) -> List[str]:
+        async with self.pool.acquire():
+            location_lower = location.lower()
+            for key, restaurants in LOCATIONS.items():
+                if key in location_lower:
+                    return restaurants
+            return LOCATIONS["default"]
+    
+    async def offers(self) -> str:
+        async with self.pool.acquire():
+            return OFFERS
+    
+    async def has_availability(self, date: str, time: str, party_size: int) -> bool:
+        # Simplified logic - in production, this would check a real database
+        async with self.pool.acquire():
+            return party_size <= MAX_ONLINE_PARTY_SIZE
+
+
+data_pool = ResourcePool("restaurant_data", size=settings.tool_pool_size)
+restaurant_data = RestaurantDataSource(data_pool)
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from backend.agents.data_sources import MENU_CATEGORIES
+from backend.agents.tools import TOOL_FUNCTIONS
+from backend.agents.tool_runtime import ToolTimeout, call_tool
+from backend.agents.greeting_manager import greeting_manager
+from backend.core import get_logger
+
+logger = get_logger("degraded_responder")
+
+TOOL_UNAVAILABLE_MESSAGE = "That information is temporarily unavailable, please try again in a moment."
+
+
+async def _tool(name: str, *args) -> str:
+    # There is no model here to rephrase a timeout, so answer in plain text.
+    try:
+        return await call_tool(TOOL_FUNCTIONS[name], *args)
+    except ToolTimeout:
+        return TOOL_UNAVAILABLE_MESSAGE
+
+
+async def _full_menu() -> str:
+    menus = await asyncio.gather(*(_tool("get_menu", c) for c in MENU_CATEGORIES))
+    menu = "\n".join(f"• {c.title()}: {items}" for c, items in zip(MENU_CATEGORIES, menus))
+    return f"Here is our menu:\n\n{menu}"
+
+
+ACTION_ANSWERS: Dict[str, Callable[[], Awaitable[str]]] = {
+    "find_restaurants": lambda: _tool("find_nearby_restaurants", "your area"),
+    "view_offers": lambda: _tool("get_special_offers"),
+    "browse_menu": _full_menu
+}
+
+FAQ_ANSWERS: List[Tuple[Tuple[str, ...], Callable[[], Awaitable[str]]]] = [
+    (("hour", "open", "close", "when are you"), lambda: _tool("get_restaurant_hours")),
+    (("phone", "contact", "email", "address", "call you"), lambda: _tool("get_location_and_contact")),
+    (("offer", "deal", "discount", "promo", "happy hour"), lambda: _tool("get_special_offers")),
+    (("menu", "dish", "food", "eat"), _full_menu),
+    (("location", "branch", "near", "where"), lambda: _tool("find_nearby_restaurants", "your area"))
+]
+
+UNAVAILABLE_MESSAGE = (
+    "Our assistant is under heavy load right now, so I can only help with the quick options below. "
+    "Please try again in a moment for anything else."
+)
+
+
+class DegradedResponder:
+    """Answers buttons and common questions straight from the tool functions when the LLM is unavailable."""
+    
+    @staticmethod
+    async def answer(action: Optional[str], message: str, reservation=None) -> Tuple[str, List[Dict[str, str]]]:
+        if reservation is not None and reservation.is_complete():
+            logger.info("Degraded mode: checking availability directly")
+            return await _tool("check_availability", reservation.date, reservation.time, reservation.party_size), []
+        
+        if action in ACTION_ANSWERS:
+            logger.info("Degraded mode: answering action %s", action)
+            return await ACTION_ANSWERS[action](), []
+        
+        message_lower = message.lower()
+        for keywords, answer in FAQ_ANSWERS:
+            if any(keyword in message_lower for keyword in keywords):
+                logger.info("Degraded mode: answering FAQ intent %s", keywords[0])
+                return await answer(), []
+        
+        _, buttons = greeting_manager.generate_initial_greeting()
+        return UNAVAILABLE_MESSAGE, buttons
+
+
+degraded_responder = DegradedResponder()
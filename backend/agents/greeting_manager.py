@@ -45,7 +45,7 @@ How may I assist you today?"""
             {"label": "📋 Browse Menu", "action": "browse_menu"}
         ]
         
-        logger.info(f"Generated initial greeting with {len(buttons)} buttons")
+        logger.info("Generated initial greeting with %s buttons", len(buttons))
         return message, buttons
     
     @staticmethod
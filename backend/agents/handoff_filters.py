@@ -0,0 +1,96 @@
+import json
+from typing import Any, Callable, Dict, Tuple
+from agents import HandoffInputData
+from agents.extensions.handoff_filters import remove_all_tools
+from backend.core import HandoffPolicy, get_logger, get_metrics
+from backend.models import ReservationSlots
+
+logger = get_logger("handoff_filters")
+metrics = get_metrics()
+
+# Rough but model-independent; good enough to compare a transcript before and after filtering.
+CHARS_PER_TOKEN = 4
+
+FilterStep = Callable[[HandoffInputData, HandoffPolicy], HandoffInputData]
+
+
+def estimate_tokens(data: HandoffInputData) -> int:
+    history = data.input_history if isinstance(data.input_history, str) else list(data.input_history)
+    items = [item.to_input_item() for item in (*data.pre_handoff_items, *data.new_items)]
+    return len(json.dumps([history, items], ensure_ascii=False, default=str)) // CHARS_PER_TOKEN
+
+
+def _history(data: HandoffInputData) -> Tuple[Dict[str, Any], ...]:
+    if isinstance(data.input_history, str):
+        return ({"role": "user", "content": data.input_history},)
+    return data.input_history
+
+
+def drop_tools(data: HandoffInputData, policy: HandoffPolicy) -> HandoffInputData:
+    """Tool calls, tool outputs and the handoff call itself."""
+    return remove_all_tools(data)
+
+
+def drop_greeting(data: HandoffInputData, policy: HandoffPolicy) -> HandoffInputData:
+    """Assistant messages before the customer's first message, i.e. the canned greeting."""
+    history = _history(data)
+    first_user = next((i for i, item in enumerate(history) if item.get("role") == "user"), 0)
+    return data.clone(input_history=history[first_user:])
+
+
+def last_turns(data: HandoffInputData, policy: HandoffPolicy) -> HandoffInputData:
+    """Only the last N customer messages and everything after them."""
+    history = _history(data)
+    user_positions = [i for i, item in enumerate(history) if item.get("role") == "user"]
+    if len(user_positions) <= policy.last_turns:
+        return data
+    return data.clone(input_history=history[user_positions[-policy.last_turns]:])
+
+
+def keep_slots(data: HandoffInputData, policy: HandoffPolicy) -> HandoffInputData:
+    """Restate reservation details already collected so trimming history does not lose them."""
+    slots = data.run_context.context if data.run_context else None
+    if not isinstance(slots, ReservationSlots):
+        return data
+    known = {name: value for name, value in slots.model_dump(include={"date", "time", "party_size"}).items() if value is not None}
+    if not known:
+        return data
+    note = {
+        "role": "system",
+        "content": "Reservation details already provided by the customer: "
+        + ", ".join(f"{name.replace('_', ' ')} {value}" for name, value in known.items())
+        + ". Do not ask for these again."
+    }
+    return data.clone(input_history=(note, *_history(data)))
+
+
+FILTER_STEPS: Dict[str, FilterStep] = {
+    "drop_tools": drop_tools,
+    "drop_greeting": drop_greeting,
+    "last_turns": last_turns,
+    "keep_slots": keep_slots
+}
+
+
+def build_input_filter(agent_name: str, policy: HandoffPolicy) -> Callable[[HandoffInputData], HandoffInputData]:
+    """Compose the policy's filter steps into a handoff input filter that reports the tokens it saves."""
+    steps = [FILTER_STEPS[name] for name in policy.filters]
+    
+    def input_filter(data: HandoffInputData) -> HandoffInputData:
+        before = estimate_tokens(data)
+        for step in steps:
+            data = step(data, policy)
+        after = estimate_tokens(data)
+        
+        # keep_slots adds a note, so a short transcript can grow slightly; that is not negative savings
+        saved = max(before - after, 0)
+        metrics.increment("handoffs.filtered")
+        metrics.increment("handoffs.tokens_before", before)
+        metrics.increment("handoffs.tokens_after", after)
+        metrics.increment("handoffs.tokens_saved", saved)
+        metrics.increment(f"handoffs.tokens_saved.{agent_name}", saved)
+        logger.info("Handoff to %s: ~%s -> ~%s input tokens", agent_name, before, after)
+        return data
+    
+    input_filter.__qualname__ = f"handoff_filter[{agent_name}]"
+    return input_filter
@@ -0,0 +1,143 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from backend.agents.data_sources import MENU_ITEMS, MenuItem
+from backend.core import get_logger
+
+logger = get_logger("menu_search")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Field weights: a match in the dish name or ingredients says more than one in the description.
+FIELD_WEIGHTS = {"name": 3, "ingredients": 2, "category": 2, "dietary": 2, "description": 1, "allergens": 1, "price": 1}
+
+# Inclusive upper bound of each price band and the words customers use for it.
+PRICE_BANDS = ((10, "cheap budget inexpensive affordable"), (20, "moderate"), (math.inf, "premium expensive pricey"))
+
+# Query words that are filler for a menu search and would otherwise dilute scores.
+STOP_WORDS = frozenset("a an and any anything are do for have i is me of on or some something the to under what with you your".split())
+
+
+# Allergens customers can ask to avoid, beyond those on the current menu.
+ALLERGENS = ("gluten", "dairy", "egg", "fish", "shellfish", "nuts", "sulphites")
+
+# Words that rule out the allergens after them ("no shellfish", "without nuts or dairy").
+NEGATIONS = frozenset({"no", "without"})
+
+
+def words(text: str) -> List[str]:
+    folded = []
+    for token in TOKEN_PATTERN.findall(text.lower().replace("_", " ")):
+        # Light plural folding so "mushrooms" matches "mushroom"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        folded.append(token)
+    return folded
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in words(text) if token not in STOP_WORDS]
+
+
+def field_text(item: MenuItem, field: str) -> str:
+    if field == "price":
+        band = next(words for limit, words in PRICE_BANDS if item.price <= limit)
+        return f"{item.display_price} {band}"
+    value = getattr(item, field)
+    return " ".join(value) if isinstance(value, tuple) else str(value)
+
+
+class MenuSearchIndex:
+    """BM25 over dish fields, with facet filters applied before ranking."""
+    
+    def __init__(self, items: Sequence[MenuItem], k1: float = 1.2, b: float = 0.75):
+        self.items = list(items)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        self._lengths: List[float] = []
+        
+        for doc_id, item in enumerate(self.items):
+            term_weights: Counter = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(field_text(item, field)):
+                    term_weights[token] += weight
+            for term, tf in term_weights.items():
+                self._postings[term].append((doc_id, tf))
+            self._lengths.append(sum(term_weights.values()))
+        
+        self._allergens = {
+            term: allergen
+            for allergen in {*ALLERGENS, *(allergen for item in self.items for allergen in item.allergens)}
+            for term in words(allergen)
+        }
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        self._idf = {
+            term: math.log(1 + (len(self.items) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+        logger.info("Menu search index built: %s items, %s terms", len(self.items), len(self._postings))
+    
+    def parse_query(self, query: str) -> Tuple[List[str], Set[str]]:
+        """Query terms, and the allergens the query rules out ("no shellfish", "dairy-free").
+        
+        Those allergen words become an exclusion filter rather than terms, which would rank the very dishes
+        that contain them first.
+        """
+        query_words = words(query)
+        terms: List[str] = []
+        ruled_out: Set[str] = set()
+        negated = False
+        for position, word in enumerate(query_words):
+            allergen = self._allergens.get(word)
+            if word in NEGATIONS:
+                negated = True
+            elif allergen and (negated or query_words[position + 1:position + 2] == ["free"]):
+                ruled_out.add(allergen)
+            elif word == "free" and position and query_words[position - 1] in self._allergens:
+                continue
+            elif word not in STOP_WORDS:
+                negated = False
+                terms.append(word)
+        return terms, ruled_out
+    
+    def search(
+        self,
+        query: str = "",
+        dietary: Iterable[str] = (),
+        exclude_allergens: Iterable[str] = (),
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        limit: int = 5
+    ) -> List[Tuple[MenuItem, float]]:
+        terms, ruled_out = self.parse_query(query)
+        required_tags, excluded = set(dietary), set(exclude_allergens) | ruled_out
+        allowed = {
+            doc_id for doc_id, item in enumerate(self.items)
+            if required_tags <= set(item.dietary)
+            and not excluded & set(item.allergens)
+            and (category is None or item.category == category)
+            and (min_price is None or item.price >= min_price)
+            and (max_price is None or item.price <= max_price)
+        }
+        
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            for doc_id, tf in self._postings.get(term, ()):
+                if doc_id not in allowed:
+                    continue
+                norm = 1 - self.b + self.b * self._lengths[doc_id] / self._avg_length
+                scores[doc_id] += self._idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        
+        if not scores:
+            # Facet-only query, or no query word is on the menu: cheapest facet matches, with score 0
+            ranked = sorted(allowed, key=lambda doc_id: self.items[doc_id].price)
+            return [(self.items[doc_id], 0.0) for doc_id in ranked[:limit]]
+        
+        ranked = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)[:limit]
+        return [(self.items[doc_id], round(score, 3)) for doc_id, score in ranked]
+
+
+menu_index = MenuSearchIndex(MENU_ITEMS)
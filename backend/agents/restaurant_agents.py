@@ -1,14 +1,18 @@
 import os
-from agents import Agent
+from typing import List, Tuple, Union
+from agents import Agent, Handoff, ModelSettings, handoff
+from backend.agents.handoff_filters import build_input_filter
 from backend.agents.tools import (
     get_menu,
+    search_menu,
     check_availability,
     get_restaurant_hours,
     get_location_and_contact,
     find_nearby_restaurants,
-    get_special_offers
+    get_special_offers,
+    request_widget
 )
-from backend.core import get_logger, get_settings
+from backend.core import get_logger, get_settings, AgentProfile
 
 logger = get_logger("restaurant_agents")
 settings = get_settings()
@@ -16,46 +20,72 @@ settings = get_settings()
 os.environ["OPENAI_API_KEY"] = settings.openai_api_key
 
 
+def resolve_agent_model(agent_name: str) -> Tuple[str, ModelSettings]:
+    """Resolve the model tier, temperature and output budget configured for an agent."""
+    profile = settings.agent_profiles.get(agent_name, AgentProfile())
+    return settings.agent_model(agent_name), ModelSettings(temperature=profile.temperature, max_tokens=profile.max_tokens)
+
+
+def with_input_filters(agents: List[Agent]) -> List[Union[Agent, Handoff]]:
+    """Wrap handoff targets that have a configured policy so they only receive the relevant transcript."""
+    return [
+        handoff(agent, input_filter=build_input_filter(agent.name, settings.handoff_policies[agent.name]))
+        if agent.name in settings.handoff_policies else agent
+        for agent in agents
+    ]
+
+
 def create_menu_agent() -> Agent:
     """Create an agent specialized in menu inquiries."""
     logger.info("Creating menu agent")
+    model, model_settings = resolve_agent_model("MenuAgent")
     return Agent(
         name="MenuAgent",
-        model=settings.openai_model,
+        model=model,
+        model_settings=model_settings,
         instructions="""You are a knowledgeable menu specialist at our restaurant.
         Help customers understand our menu offerings, explain dishes, and make recommendations.
-        Be enthusiastic about the food and provide helpful descriptions.""",
-        tools=[get_menu]
+        Be enthusiastic about the food and provide helpful descriptions.
+        
+        For questions about specific dishes, ingredients, diets, allergens or prices, call search_menu
+        with the matching filters instead of fetching whole categories. Use get_menu only when the
+        customer asks to see a full category.""",
+        tools=[search_menu, get_menu]
     )
 
 
 def create_reservation_agent() -> Agent:
     """Create an agent specialized in reservations."""
     logger.info("Creating reservation agent")
+    model, model_settings = resolve_agent_model("ReservationAgent")
     return Agent(
         name="ReservationAgent",
-        model=settings.openai_model,
+        model=model,
+        model_settings=model_settings,
         instructions="""You are a reservation specialist.
         Help customers make reservations by collecting information step by step.
         
         Follow this order:
-        1. Ask "What date would you like to book?" (user will use date picker)
-        2. Ask "What time would you prefer?" (user will use time picker)
-        3. Ask "How many guests will be dining?" (user will use number selector)
+        1. Ask "What date would you like to book?" and call request_widget with kind "date"
+        2. Ask "What time would you prefer?" and call request_widget with kind "time"
+        3. Ask "How many guests will be dining?" and call request_widget with kind "party_size"
         4. Once you have all three, use check_availability tool
         5. Confirm the reservation details
         
+        Always call request_widget when asking for a date, time or party size so the customer gets a picker.
         Be friendly and patient. If they provide info out of order, acknowledge it and ask for missing pieces.""",
-        tools=[check_availability, get_restaurant_hours]
+        tools=[check_availability, get_restaurant_hours, request_widget]
     )
 
 
 def create_location_agent() -> Agent:
     """Create an agent for finding restaurant locations."""
     logger.info("Creating location agent")
+    model, model_settings = resolve_agent_model("LocationAgent")
     return Agent(
         name="LocationAgent",
-        model=settings.openai_model,
+        model=model,
+        model_settings=model_settings,
         instructions="""You help customers find restaurant locations near them.
         Ask for their preferred area, neighborhood, or zip code.
         Use the find_nearby_restaurants tool to show available locations.
@@ -67,9 +97,11 @@ def create_location_agent() -> Agent:
 def create_offers_agent() -> Agent:
     """Create an agent for special offers and deals."""
     logger.info("Creating offers agent")
+    model, model_settings = resolve_agent_model("OffersAgent")
     return Agent(
         name="OffersAgent",
-        model=settings.openai_model,
+        model=model,
+        model_settings=model_settings,
         instructions="""You share information about special offers, deals, and promotions.
         Be enthusiastic and help customers save money.
         Explain terms and restrictions clearly.""",
@@ -80,9 +112,11 @@ def create_offers_agent() -> Agent:
 def create_info_agent() -> Agent:
     """Create an agent for general restaurant information."""
     logger.info("Creating info agent")
+    model, model_settings = resolve_agent_model("InfoAgent")
     return Agent(
         name="InfoAgent",
-        model=settings.openai_model,
+        model=model,
+        model_settings=model_settings,
         instructions="""You provide general restaurant information including
         hours, contact details, and policies.
         Be helpful and concise.""",
@@ -99,10 +133,12 @@ def create_main_agent() -> Agent:
     reservation_agent = create_reservation_agent()
     offers_agent = create_offers_agent()
     info_agent = create_info_agent()
+    model, model_settings = resolve_agent_model("MainAgent")
     
     return Agent(
         name="MainAgent",
-        model=settings.openai_model,
+        model=model,
+        model_settings=model_settings,
         instructions="""You are the main receptionist at our restaurant chain.
         Greet customers warmly and route them to the right specialist.
         
@@ -114,6 +150,6 @@ def create_main_agent() -> Agent:
         
         If unsure, ask clarifying questions to route them correctly.
         Be friendly, professional, and helpful.""",
-        handoffs=[location_agent, menu_agent, reservation_agent, offers_agent, info_agent]
+        handoffs=with_input_filters([location_agent, menu_agent, reservation_agent, offers_agent, info_agent])
     )
 
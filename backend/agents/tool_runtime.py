@@ -0,0 +1,192 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+from agents import FunctionTool, function_tool
+from backend.core import get_logger, get_metrics, get_settings
+
+logger = get_logger("tool_runtime")
+metrics = get_metrics()
+settings = get_settings()
+
+ToolFunction = Callable[..., Union[str, Awaitable[str]]]
+
+TOOL_FUNCTIONS: Dict[str, ToolFunction] = {}
+
+
+class ToolTimeout(Exception):
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"Tool {name} timed out after {timeout}s")
+        self.name = name
+        self.timeout = timeout
+
+
+class SyncToolOffloader:
+    """Runs sync tools (e.g. third-party clients without an async API) inline or on a bounded thread pool depending on the configured offload mode."""
+    
+    def __init__(self, mode: str, threshold_ms: float, max_workers: int):
+        self.mode = mode
+        self.threshold_seconds = threshold_ms / 1000
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._blocking_tools: Set[str] = set()
+    
+    def should_offload(self, tool_name: str) -> bool:
+        return self.mode == "always" or (self.mode == "auto" and tool_name in self._blocking_tools)
+    
+    async def call(self, func: Callable[..., str], *args, **kwargs) -> str:
+        name = func.__name__
+        if self.should_offload(name):
+            metrics.increment(f"tools.offloaded.{name}")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+            # Executor threads don't inherit contextvars, so carry the request context over explicitly.
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(context.run, func, *args, **kwargs)
+            )
+        
+        metrics.increment(f"tools.inline.{name}")
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        if self.mode == "auto" and elapsed > self.threshold_seconds:
+            logger.warning("Tool %s blocked the event loop for %.1fms, offloading future calls", name, elapsed * 1000)
+            metrics.increment(f"tools.flagged_blocking.{name}")
+            self._blocking_tools.add(name)
+        return result
+
+
+offloader = SyncToolOffloader(
+    mode=settings.tool_offload_mode,
+    threshold_ms=settings.tool_offload_threshold_ms,
+    max_workers=settings.tool_offload_workers
+)
+
+
+@dataclass
+class CacheEntry:
+    future: "asyncio.Future[str]"
+    expires_at: float
+    speculative: bool
+    consumed: bool = False
+
+
+class ToolResultCache:
+    """Short-lived cache of read-only tool results that also shares calls still in flight.
+    
+    Entries can be filled speculatively ahead of the real call; the first real read of such an
+    entry counts as a speculation hit.
+    """
+    
+    def __init__(self, ttls: Dict[str, float], max_entries: int):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+    
+    def cacheable(self, name: str) -> bool:
+        return self.ttls.get(name, 0) > 0
+    
+    async def get_or_run(self, name: str, args_key: str, run: Callable[[], Awaitable[str]], speculative: bool = False) -> str:
+        key = (name, args_key)
+        entry = self._entries.get(key)
+        if entry and entry.expires_at > time.monotonic():
+            if not speculative:
+                metrics.increment(f"tools.cache_hits.{name}")
+                if entry.speculative and not entry.consumed:
+                    entry.consumed = True
+                    metrics.increment("speculation.hits")
+            return await asyncio.shield(entry.future)
+        
+        metrics.increment("speculation.prefetched" if speculative else f"tools.cache_misses.{name}")
+        future = asyncio.ensure_future(run())
+        self._entries[key] = CacheEntry(future, time.monotonic() + self.ttls[name], speculative)
+        self._entries.move_to_end(key)
+        future.add_done_callback(lambda done: self._drop_failed(key, done))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return await asyncio.shield(future)
+    
+    def _drop_failed(self, key: Tuple[str, str], future: "asyncio.Future[str]"):
+        # Only successful results are worth reusing
+        if future.cancelled() or future.exception() is not None:
+            entry = self._entries.get(key)
+            if entry and entry.future is future:
+                del self._entries[key]
+
+
+tool_cache = ToolResultCache(ttls=settings.tool_cache_ttl_seconds, max_entries=settings.tool_cache_max_entries)
+
+
+def tool_timeout(name: str) -> float:
+    return settings.tool_timeouts.get(name, settings.tool_timeout_seconds)
+
+
+def timeout_result(name: str, timeout: float) -> str:
+    """Structured result the model gets instead of an exception when a tool runs out of time."""
+    return json.dumps({
+        "status": "timeout",
+        "tool": name,
+        "timeout_seconds": timeout,
+        "message": "This information is temporarily unavailable. Tell the customer briefly and offer to try again or help with something else."
+    })
+
+
+def _arguments_key(func: ToolFunction, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    """Normalize positional and keyword arguments so equivalent calls share a cache entry."""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return json.dumps(bound.arguments, sort_keys=True, default=str)
+
+
+async def _invoke(func: ToolFunction, args: Tuple[Any, ...], kwargs: Dict[str, Any], speculative: bool) -> str:
+    name = func.__name__
+    timeout = tool_timeout(name)
+    
+    def run() -> Awaitable[str]:
+        return func(*args, **kwargs) if inspect.iscoroutinefunction(func) else offloader.call(func, *args, **kwargs)
+    
+    call = tool_cache.get_or_run(name, _arguments_key(func, args, kwargs), run, speculative) if tool_cache.cacheable(name) else run()
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Tool %s timed out after %ss", name, timeout)
+        metrics.increment(f"tools.timeouts.{name}")
+        raise ToolTimeout(name, timeout)
+
+
+async def call_tool(func: ToolFunction, *args, **kwargs) -> str:
+    """Run a tool function (async, or sync via the offloader) under its timeout, through the result cache.
+    
+    Raises ToolTimeout when the tool runs out of time.
+    """
+    return await _invoke(func, args, kwargs, speculative=False)
+
+
+async def prefetch_tool(name: str, *args, **kwargs) -> bool:
+    """Warm the cache for a call the next turn is likely to make; returns False if the tool is not cacheable."""
+    func = TOOL_FUNCTIONS[name]
+    if not tool_cache.cacheable(name):
+        return False
+    await _invoke(func, args, kwargs, speculative=True)
+    return True
+
+
+def restaurant_tool(func: ToolFunction) -> FunctionTool:
+    """Expose a function as an agent tool while keeping it callable directly (e.g. for degraded mode)."""
+    TOOL_FUNCTIONS[func.__name__] = func
+    
+    @functools.wraps(func)
+    async def run_tool(*args, **kwargs) -> str:
+        try:
+            return await call_tool(func, *args, **kwargs)
+        except ToolTimeout as e:
+            return timeout_result(e.name, e.timeout)
+    
+    return function_tool(run_tool)
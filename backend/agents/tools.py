@@ -1,32 +1,69 @@
-from agents import function_tool
-from backend.core import get_logger
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+from backend.agents.data_sources import MAX_ONLINE_PARTY_SIZE, restaurant_data
+from backend.agents.menu_search import menu_index
+from backend.agents.tool_runtime import TOOL_FUNCTIONS, restaurant_tool
+from backend.core import get_logger, redact
 
 logger = get_logger("tools")
 
 
-@function_tool
-def get_menu(category: str) -> str:
+@restaurant_tool
+async def get_menu(category: str) -> str:
     """Get restaurant menu items by category.
     
     Args:
         category: The menu category (appetizers, mains, desserts, drinks)
     """
-    logger.info(f"Getting menu for category: {category}")
+    logger.info("Getting menu for category: %s", category)
     
-    menus = {
-        "appetizers": "Bruschetta ($8), Calamari ($12), Caesar Salad ($10)",
-        "mains": "Pasta Carbonara ($18), Grilled Salmon ($24), Ribeye Steak ($32)",
-        "desserts": "Tiramisu ($9), Chocolate Lava Cake ($10), Panna Cotta ($8)",
-        "drinks": "Wine ($8-15/glass), Beer ($6-8), Cocktails ($12-16)"
-    }
-    
-    result = menus.get(category.lower(), "Category not found. Available: appetizers, mains, desserts, drinks")
-    logger.debug(f"Menu result: {result}")
+    result = await restaurant_data.menu(category)
+    logger.debug("Menu result: %s", redact(result))
     return result
 
 
-@function_tool
-def check_availability(date: str, time: str, party_size: int) -> str:
+@restaurant_tool
+async def search_menu(
+    query: str,
+    dietary: Optional[List[Literal["vegetarian", "vegan", "pescatarian", "gluten_free", "dairy_free"]]] = None,
+    exclude_allergens: Optional[List[Literal["gluten", "dairy", "egg", "fish", "shellfish", "nuts", "sulphites"]]] = None,
+    category: Optional[Literal["appetizers", "mains", "desserts", "drinks"]] = None,
+    max_price: Optional[float] = None,
+    min_price: Optional[float] = None
+) -> str:
+    """Search dishes by name, ingredient or description, optionally filtered by diet, allergens, category and price.
+    
+    Args:
+        query: Free-text words such as a dish, ingredient or style (may be empty when only filtering). Put diets and allergens in dietary and exclude_allergens rather than here
+        dietary: Dietary tags every result must have
+        exclude_allergens: Allergens the results must not contain
+        category: Restrict results to one menu category
+        max_price: Highest price in dollars
+        min_price: Lowest price in dollars
+    """
+    logger.info("Searching menu: %s", redact(query))
+    
+    results = menu_index.search(
+        query,
+        dietary=dietary or (),
+        exclude_allergens=exclude_allergens or (),
+        category=category,
+        min_price=min_price,
+        max_price=max_price
+    )
+    if not results:
+        return "No dishes match those criteria."
+    
+    unmatched = menu_index.parse_query(query)[0] and not any(score for _, score in results)
+    return ("No dish mentions that, but these match the other criteria:\n" if unmatched else "") + "\n".join(
+        f"{item.name} ({item.display_price}, {item.category}): {item.description}."
+        f" Tags: {', '.join(item.dietary) or 'none'}. Allergens: {', '.join(item.allergens) or 'none'}."
+        for item, _ in results
+    )
+
+
+@restaurant_tool
+async def check_availability(date: str, time: str, party_size: int) -> str:
     """Check table availability for a reservation.
     
     Args:
@@ -34,66 +71,38 @@ def check_availability(date: str, time: str, party_size: int) -> str:
         time: Time in HH:MM format (24-hour)
         party_size: Number of guests
     """
-    logger.info(f"Checking availability: {date} {time} for {party_size} guests")
+    logger.info("Checking availability: %s %s for %s guests", date, time, party_size)
     
-    # Simplified logic - in production, this would check a real database
-    if party_size > 8:
-        return f"For parties larger than 8, please call us directly at (555) 123-4567"
+    if not await restaurant_data.has_availability(date, time, party_size):
+        return f"For parties larger than {MAX_ONLINE_PARTY_SIZE}, please call us directly at (555) 123-4567"
     
     return f"Yes, we have availability on {date} at {time} for {party_size} guests. Would you like to make a reservation?"
 
 
-@function_tool
-def get_restaurant_hours() -> str:
+@restaurant_tool
+async def get_restaurant_hours() -> str:
     """Get restaurant operating hours."""
     logger.info("Getting restaurant hours")
-    return "Monday-Thursday: 11:00 AM - 10:00 PM, Friday-Saturday: 11:00 AM - 11:00 PM, Sunday: 12:00 PM - 9:00 PM"
+    return await restaurant_data.hours()
 
 
-@function_tool
-def get_location_and_contact() -> str:
+@restaurant_tool
+async def get_location_and_contact() -> str:
     """Get restaurant location and contact information."""
     logger.info("Getting location and contact info")
-    return "123 Main Street, Downtown. Phone: (555) 123-4567. Email: info@restaurant.com"
+    return await restaurant_data.contact()
 
 
-@function_tool
-def find_nearby_restaurants(location: str) -> str:
+@restaurant_tool
+async def find_nearby_restaurants(location: str) -> str:
     """Find restaurant locations near the specified area.
     
     Args:
         location: City name, neighborhood, or zip code to search near
     """
-    logger.info(f"Finding restaurants near: {location}")
-    
-    # Simulated restaurant locations
-    restaurants = {
-        "downtown": [
-            "Main Street Location - 123 Main St (Open 11AM-11PM)",
-            "Plaza Branch - 456 Plaza Ave (Open 10AM-10PM)",
-            "Waterfront - 789 Harbor Blvd (Open 12PM-12AM)"
-        ],
-        "uptown": [
-            "Uptown Square - 321 High St (Open 11AM-10PM)",
-            "Park Avenue - 654 Park Ave (Open 11AM-11PM)"
-        ],
-        "default": [
-            "Downtown Main - 123 Main St",
-            "Plaza Branch - 456 Plaza Ave",
-            "Uptown Square - 321 High St"
-        ]
-    }
+    logger.info("Finding restaurants near: %s", redact(location))
     
-    location_lower = location.lower()
-    found_restaurants = None
-    
-    for key in restaurants:
-        if key in location_lower:
-            found_restaurants = restaurants[key]
-            break
-    
-    if not found_restaurants:
-        found_restaurants = restaurants["default"]
+    found_restaurants = await restaurant_data.locations(location)
     
     result = f"Here are our restaurant locations near {location}:\n\n"
     result += "\n".join(f"• {r}" for r in found_restaurants)
@@ -102,20 +111,28 @@ def find_nearby_restaurants(location: str) -> str:
     return result
 
 
-@function_tool
-def get_special_offers() -> str:
+@restaurant_tool
+async def get_special_offers() -> str:
     """Get current special offers and deals."""
     logger.info("Getting special offers")
-    
-    offers = """Here are our current special offers:
+    return await restaurant_data.offers()
 
-🎉 **Weekend Special**: 20% off all appetizers (Fri-Sun)
-🍝 **Lunch Deal**: Pasta + Drink for $15 (Mon-Fri, 11AM-3PM)
-🎂 **Birthday Month**: Free dessert with valid ID
-👨‍👩‍👧‍👦 **Family Bundle**: 4-course meal for 4 people - $89 (Save $20!)
-🥂 **Happy Hour**: 50% off drinks (Mon-Thu, 4-6PM)
 
-All offers valid at participating locations. Some restrictions apply."""
-    
-    return offers
+class WidgetConfig(BaseModel):
+    max_days_ahead: Optional[int] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    interval_minutes: Optional[int] = None
+    max_value: Optional[int] = None
 
+
+@restaurant_tool
+async def request_widget(kind: Literal["date", "time", "party_size"], config: Optional[WidgetConfig] = None) -> str:
+    """Show an interactive input widget to the customer alongside your reply.
+    
+    Args:
+        kind: The widget to show (date picker, time picker or party size selector)
+        config: Optional overrides for the widget defaults, leave null to use defaults
+    """
+    logger.info("Widget requested: %s", kind)
+    return f"The {kind} widget is shown to the customer. Ask them to use it."
@@ -1,14 +1,20 @@
-from typing import List, Dict, Any
-from backend.core import get_logger
+import json
+from typing import List, Dict, Any, Optional
+from backend.core import get_logger, get_metrics, redact
 
 logger = get_logger("widget_manager")
+metrics = get_metrics()
+
+WIDGET_TOOL_NAME = "request_widget"
+WIDGET_ACTIONS = {"select_date", "select_time", "select_party_size"}
 
 
 class WidgetManager:
     
     @staticmethod
-    def create_reservation_widgets(step: str) -> List[Dict[str, Any]]:
-        """Create interactive widgets based on reservation step."""
+    def create_reservation_widgets(step: str, config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Create interactive widgets based on reservation step, applying any config overrides."""
+        overrides = {k: v for k, v in (config or {}).items() if v is not None}
         
         if step == "date":
             return [{
@@ -17,7 +23,8 @@ class WidgetManager:
                 "widget_type": "date",
                 "widget_config": {
                     "min_date": "today",
-                    "max_days_ahead": 60
+                    "max_days_ahead": 60,
+                    **overrides
                 }
             }]
         
@@ -29,7 +36,8 @@ class WidgetManager:
                 "widget_config": {
                     "start_time": "11:00",
                     "end_time": "22:00",
-                    "interval_minutes": 30
+                    "interval_minutes": 30,
+                    **overrides
                 }
             }]
         
@@ -42,15 +50,95 @@ class WidgetManager:
                     "min_value": 1,
                     "max_value": 12,
                     "default_value": 2,
-                    "step": 1
+                    "step": 1,
+                    **overrides
                 }
             }]
         
         return []
     
     @staticmethod
-    def detect_reservation_step(message_content: str) -> str:
-        """Detect which reservation step we're at based on agent message."""
+    def find_tool_calls(run_items: List[Any], tool_name: str) -> List[Any]:
+        """Return the raw tool call items for the given tool from a run's new items."""
+        return [
+            item.raw_item for item in run_items
+            if getattr(item, "type", None) == "tool_call_item"
+            and getattr(item.raw_item, "name", None) == tool_name
+        ]
+    
+    @staticmethod
+    def extract_requested_widgets(run_items: List[Any]) -> List[Dict[str, Any]]:
+        """Collect widgets the agent explicitly requested through the request_widget tool."""
+        widgets = []
+        for raw_item in WidgetManager.find_tool_calls(run_items, WIDGET_TOOL_NAME):
+            try:
+                arguments = json.loads(raw_item.arguments or "{}")
+            except json.JSONDecodeError:
+                logger.warning("Ignoring malformed %s arguments: %s", WIDGET_TOOL_NAME, redact(raw_item.arguments))
+                continue
+            widgets.extend(WidgetManager.create_reservation_widgets(arguments.get("kind"), arguments.get("config")))
+        return widgets
+    
+    @staticmethod
+    def resolve_widgets(run_items: List[Any], response_text: str) -> List[Dict[str, Any]]:
+        """Prefer tool-emitted widgets and fall back to phrase detection on the reply."""
+        widgets = WidgetManager.extract_requested_widgets(run_items)
+        if widgets:
+            metrics.increment("widgets.emitted.tool", len(widgets))
+            metrics.increment("widgets.emitted", len(widgets))
+            return widgets
+        
+        step = WidgetManager.detect_reservation_step(response_text)
+        widgets = WidgetManager.create_reservation_widgets(step) if step else []
+        if widgets:
+            metrics.increment("widgets.emitted.fallback", len(widgets))
+            metrics.increment("widgets.emitted", len(widgets))
+        return widgets
+    
+    @staticmethod
+    def track_user_turn(conversation, action: Optional[str], widget_data: Optional[Dict[str, Any]]) -> None:
+        """Record whether the user answered a shown widget or had to fall back to free text."""
+        in_reservation = (
+            action == "make_reservation"
+            or conversation.pending_widget is not None
+            or (conversation.reservation.active and conversation.reservation_turns > 0)
+        )
+        if not in_reservation:
+            if conversation.reservation_turns:
+                # Booking abandoned without an availability check; later turns are not reservation turns
+                metrics.increment("reservations.abandoned")
+                conversation.reservation_turns = 0
+            return
+        
+        conversation.reservation_turns += 1
+        metrics.increment("reservations.turns")
+        
+        if widget_data and widget_data.get("action") in WIDGET_ACTIONS:
+            metrics.increment("widgets.submitted")
+            return
+        
+        if action == "make_reservation":
+            return
+        
+        metrics.increment("reservations.extra_turns")
+        if conversation.pending_widget:
+            metrics.increment("widgets.misfire")
+    
+    @staticmethod
+    def track_agent_turn(conversation, widgets: List[Dict[str, Any]], booking_checked: bool) -> None:
+        """Remember the widget awaiting input and close out the booking once availability was checked."""
+        conversation.pending_widget = widgets[0]["action"] if widgets else None
+        conversation.pending_widget_config = widgets[0]["widget_config"] if widgets else None
+        
+        if booking_checked and conversation.reservation_turns:
+            metrics.increment("reservations.completed")
+            conversation.reservation_turns = 0
+            conversation.pending_widget = None
+            conversation.pending_widget_config = None
+    
+    @staticmethod
+    def detect_reservation_step(message_content: str) -> Optional[str]:
+        """Detect which reservation step we're at based on agent message (fallback only)."""
         content_lower = message_content.lower()
         
         if any(word in content_lower for word in ["what date", "which date", "when would you", "select a date"]):
@@ -1,4 +1,4 @@
 from .routes import router
+from .middleware import RequestContextMiddleware
 
-__all__ = ["router"]
-
+__all__ = ["router", "RequestContextMiddleware"]
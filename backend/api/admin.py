@@ -0,0 +1,69 @@
+import asyncio
+import hmac
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from backend.api.schemas import CpuProfileResponse, HeapDiffResponse, MemoryResponse
+from backend.services import session_manager
+from backend.core import get_cpu_profiler, get_heap_profiler, get_logger, get_settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = get_logger("admin")
+settings = get_settings()
+heap_profiler = get_heap_profiler()
+cpu_profiler = get_cpu_profiler()
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints stay hidden unless ADMIN_TOKEN is configured and the request presents it."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        logger.warning("Rejected admin request with missing or invalid token")
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+admin_router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@admin_router.get("/memory", response_model=MemoryResponse)
+async def get_memory(top: int = 10, sessions: int = 50):
+    report = session_manager.memory_report(top_conversations=top, max_sessions=sessions)
+    process = {"max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} if resource else {}
+    return MemoryResponse(
+        **report,
+        process=process,
+        tracemalloc=heap_profiler.status()
+    )
+
+
+@admin_router.post("/memory/snapshot", response_model=HeapDiffResponse)
+async def take_heap_snapshot(top: int = 20, group_by: Literal["module", "package"] = "module"):
+    # Snapshots walk every traced block, so keep them off the event loop.
+    return HeapDiffResponse(**await asyncio.to_thread(heap_profiler.snapshot_diff, top, group_by))
+
+
+@admin_router.delete("/memory/snapshot", response_model=HeapDiffResponse)
+async def stop_heap_tracing():
+    heap_profiler.stop()
+    return HeapDiffResponse(status="stopped")
+
+
+@admin_router.post("/profile/cpu", response_model=CpuProfileResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=settings.cpu_profile_max_seconds),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    all_threads: bool = False,
+    format: Literal["json", "collapsed"] = "json"
+):
+    """Sample the live process; `collapsed` returns flamegraph.pl/speedscope input with the route as root frame."""
+    if cpu_profiler.running:
+        raise HTTPException(status_code=409, detail="A CPU profile is already running")
+    profile = await cpu_profiler.profile(seconds, interval_ms, all_threads)
+    if format == "collapsed":
+        return PlainTextResponse("\n".join(profile["collapsed"]) + "\n")
+    return CpuProfileResponse(**profile)
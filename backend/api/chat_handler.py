@@ -0,0 +1,313 @@
+import asyncio
+import time
+import openai
+from fastapi import HTTPException
+from datetime import datetime
+from backend.api.schemas import (
+    CreateConversationResponse,
+    ChatRequest,
+    ChatResponse,
+    QuickActionButton
+)
+from typing import Any, Dict, Tuple
+from backend.services import (
+    session_manager,
+    reservation_flow,
+    agent_runner,
+    idempotency_cache,
+    traffic_capture,
+    speculator,
+    analytics
+)
+from backend.services.resilience import CircuitOpenError
+from backend.agents import create_main_agent
+from backend.agents.restaurant_agents import create_reservation_agent
+from backend.agents.greeting_manager import greeting_manager
+from backend.agents.widget_manager import widget_manager
+from backend.agents.degraded_responder import degraded_responder
+from backend.core import get_logger, get_metrics, get_settings, redact
+
+logger = get_logger("chat_handler")
+metrics = get_metrics()
+settings = get_settings()
+
+ACTION_PROMPTS = {
+    "find_restaurants": "I'd like to find restaurant locations near me.",
+    "make_reservation": "I want to make a reservation.",
+    "view_offers": "What special offers do you have?",
+    "browse_menu": "Can I see your menu?"
+}
+
+
+class ChatHandler:
+    """Transport-independent chat turn handling shared by the HTTP and WebSocket routes."""
+    
+    def __init__(self):
+        self.main_agent = create_main_agent()
+        self.reservation_agent = create_reservation_agent()
+    
+    def open_conversation(self, session_id: str) -> CreateConversationResponse:
+        conversation_id = session_manager.create_conversation(session_id)
+        if not conversation_id:
+            logger.error("Session not found: %s", session_id)
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        greeting_message, buttons = greeting_manager.generate_initial_greeting()
+        
+        conversation = session_manager.get_conversation(session_id, conversation_id)
+        conversation.add_message("assistant", greeting_message, {"buttons": [b for b in buttons]})
+        
+        logger.info("Added initial greeting to conversation %s", conversation_id)
+        speculator.schedule(conversation_id, buttons, conversation.reservation)
+        analytics.emit("conversation_started", session_id, conversation_id, detail={"buttons": [b["action"] for b in buttons]})
+        
+        return CreateConversationResponse(
+            conversation_id=conversation_id,
+            initial_message=greeting_message,
+            buttons=[QuickActionButton(**btn) for btn in buttons]
+        )
+    
+    async def handle(self, request: ChatRequest) -> ChatResponse:
+        if not traffic_capture.enabled and not analytics.enabled:
+            return await self._handle_turn(request)
+        
+        arrived_at = time.monotonic()
+        status = 500
+        try:
+            response = await self._handle_turn(request)
+            status = 200
+            return response
+        except HTTPException as e:
+            status = e.status_code
+            raise
+        except asyncio.CancelledError:
+            status = 499
+            raise
+        finally:
+            traffic_capture.record(
+                request.session_id,
+                request.conversation_id,
+                request.model_dump(include={"message", "action", "widget_data"}),
+                status,
+                arrived_at,
+                time.monotonic() - arrived_at
+            )
+            analytics.emit(
+                "turn",
+                request.session_id,
+                request.conversation_id,
+                action=request.action,
+                status=str(status),
+                latency_ms=(time.monotonic() - arrived_at) * 1000
+            )
+    
+    async def _handle_turn(self, request: ChatRequest) -> ChatResponse:
+        deadline = time.monotonic() + settings.chat_deadline_seconds
+        conversation = session_manager.get_conversation(
+            request.session_id, 
+            request.conversation_id
+        )
+        
+        if not conversation:
+            logger.error("Conversation not found: %s", request.conversation_id)
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        
+        user_message = request.message
+        
+        if request.widget_data:
+            formatted_widget = widget_manager.format_widget_response(request.widget_data)
+            user_message = formatted_widget
+            logger.info("Widget data converted to: %s", redact(user_message))
+        elif request.action and request.action in ACTION_PROMPTS:
+            user_message = ACTION_PROMPTS[request.action]
+            logger.info("Button action %s converted to: %s", request.action, redact(user_message))
+        
+        checkpoint = conversation.checkpoint()
+        flow_step = reservation_flow.handle(conversation, request.action, request.widget_data)
+        widget_manager.track_user_turn(conversation, request.action, request.widget_data)
+        
+        if flow_step and flow_step.agent_input:
+            user_message = flow_step.agent_input
+        
+        conversation.add_message("user", user_message, request.metadata)
+        self._emit_user_event(request, user_message)
+        
+        if flow_step and flow_step.reply:
+            conversation.add_message("assistant", flow_step.reply)
+            analytics.emit(
+                "assistant_message",
+                request.session_id,
+                request.conversation_id,
+                agent="ReservationFlow",
+                detail={"chars": len(flow_step.reply), "buttons": [w["action"] for w in flow_step.widgets]}
+            )
+            widget_manager.track_agent_turn(conversation, flow_step.widgets, booking_checked=False)
+            metrics.increment("reservations.llm_runs_saved")
+            logger.info("Reservation flow answered without agent run, next widgets: %s", [w['action'] for w in flow_step.widgets])
+            speculator.schedule(request.conversation_id, flow_step.widgets, conversation.reservation)
+            return ChatResponse(
+                response=flow_step.reply,
+                conversation_id=request.conversation_id,
+                timestamp=datetime.now(),
+                buttons=[QuickActionButton(**w) for w in flow_step.widgets]
+            )
+        
+        agent = self.reservation_agent if flow_step else self.main_agent
+        
+        try:
+            result, usage = await self._run_agent(agent, request, conversation, deadline)
+            
+            response_text = result.final_output
+            
+            conversation.add_message("assistant", response_text, {"usage": usage})
+            if settings.run_state_mode == "session":
+                conversation.save_response(result.last_response_id)
+            
+            widgets = widget_manager.resolve_widgets(result.new_items, response_text)
+            booking_checked = bool(widget_manager.find_tool_calls(result.new_items, "check_availability"))
+            widget_manager.track_agent_turn(conversation, widgets, booking_checked)
+            analytics.emit(
+                "assistant_message",
+                request.session_id,
+                request.conversation_id,
+                agent=result.last_agent.name,
+                detail={
+                    "chars": len(response_text),
+                    "buttons": [w["action"] for w in widgets],
+                    "input_tokens": usage.get("input_tokens"),
+                    "output_tokens": usage.get("output_tokens"),
+                    "handoff_chain": usage.get("handoff_chain")
+                }
+            )
+            if booking_checked:
+                self._emit_reservation_completed(request, conversation)
+                reservation_flow.complete(conversation)
+            response_buttons = None
+            
+            if widgets:
+                response_buttons = [QuickActionButton(**w) for w in widgets]
+                logger.info("Added %s widget(s): %s", len(widgets), [w['action'] for w in widgets])
+                speculator.schedule(request.conversation_id, widgets, conversation.reservation)
+            
+            logger.debug("Generated response for conversation %s", request.conversation_id)
+            
+            return ChatResponse(
+                response=response_text,
+                conversation_id=request.conversation_id,
+                timestamp=datetime.now(),
+                buttons=response_buttons
+            )
+            
+        except CircuitOpenError:
+            return await self._degraded_response(request, conversation, user_message)
+        except asyncio.CancelledError:
+            self._abandon_turn(request, conversation, checkpoint)
+            raise
+        except asyncio.TimeoutError:
+            logger.error("Agent run exceeded the %ss deadline", settings.chat_deadline_seconds)
+            raise HTTPException(status_code=504, detail="The assistant took too long to respond, please try again")
+        except Exception as e:
+            logger.error("Error running agent: %s", redact(e))
+            raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    
+    @staticmethod
+    def _abandon_turn(request: ChatRequest, conversation, checkpoint):
+        """The client went away mid-run: drop its unanswered message so the next turn sees a consistent transcript."""
+        rolled_back = conversation.rollback(checkpoint)
+        speculator.cancel(request.conversation_id)
+        metrics.increment("chat.cancelled_turns")
+        logger.info(
+            "Turn cancelled for conversation %s, user message %s",
+            request.conversation_id, "rolled back" if rolled_back else "marked cancelled"
+        )
+    
+    @staticmethod
+    def _emit_user_event(request: ChatRequest, user_message: str):
+        if request.widget_data:
+            analytics.emit(
+                "widget_submit",
+                request.session_id,
+                request.conversation_id,
+                action=request.widget_data.get("action"),
+                detail={"value": request.widget_data.get("value")}
+            )
+        elif request.action:
+            analytics.emit("button_click", request.session_id, request.conversation_id, action=request.action)
+        else:
+            analytics.emit("user_message", request.session_id, request.conversation_id, detail={"chars": len(user_message)})
+    
+    @staticmethod
+    def _emit_reservation_completed(request: ChatRequest, conversation):
+        analytics.emit(
+            "reservation_completed",
+            request.session_id,
+            request.conversation_id,
+            detail=conversation.reservation.model_dump(include={"date", "time", "party_size"})
+        )
+    
+    async def _run_agent(self, agent, request: ChatRequest, conversation, deadline: float) -> Tuple[Any, Dict[str, Any]]:
+        """Transcript mode resends every message; session mode sends only new messages on top of the last response."""
+        previous_response_id = conversation.response_id if settings.run_state_mode == "session" else None
+        run_input = conversation.pending_input() if previous_response_id else [
+            {"role": msg.role, "content": msg.content}
+            for msg in conversation.messages
+        ]
+        try:
+            return await agent_runner.run(
+                agent,
+                run_input,
+                request.session_id,
+                request.conversation_id,
+                deadline=deadline,
+                context=conversation.reservation,
+                previous_response_id=previous_response_id
+            )
+        except openai.BadRequestError as e:
+            if not previous_response_id or not self._is_stale_response(e):
+                raise
+            # Server-held state can expire; fall back to the full transcript once and start a new chain
+            logger.warning("Previous response %s was rejected, resending the full transcript", previous_response_id)
+            metrics.increment("run_state.resets")
+            conversation.save_response(None)
+            return await self._run_agent(agent, request, conversation, deadline)
+    
+    @staticmethod
+    def _is_stale_response(error: openai.BadRequestError) -> bool:
+        """Only a rejected previous_response_id is worth a full-transcript retry; other 400s would fail again."""
+        message = str(error.message).lower()
+        return (
+            error.param == "previous_response_id"
+            or error.code == "previous_response_not_found"
+            or ("previous response" in message and "not found" in message)
+        )
+    
+    async def _degraded_response(self, request: ChatRequest, conversation, user_message: str) -> ChatResponse:
+        """Answer without the LLM while the circuit breaker is open."""
+        reservation = conversation.reservation if conversation.reservation.active else None
+        response_text, buttons = await degraded_responder.answer(request.action, user_message, reservation)
+        if reservation and reservation.is_complete():
+            self._emit_reservation_completed(request, conversation)
+            reservation_flow.complete(conversation)
+        
+        conversation.add_message("assistant", response_text, {"degraded": True})
+        analytics.emit("assistant_message", request.session_id, request.conversation_id, agent="degraded", detail={"chars": len(response_text)})
+        metrics.increment("resilience.degraded_responses")
+        logger.warning("Served degraded response for conversation %s", request.conversation_id)
+        
+        return ChatResponse(
+            response=response_text,
+            conversation_id=request.conversation_id,
+            timestamp=datetime.now(),
+            buttons=[QuickActionButton(**b) for b in buttons] or None
+        )
+    
+    async def handle_idempotent(self, request: ChatRequest, key: str) -> Tuple[bytes, bool]:
+        """Run a turn at most once per (conversation, key) and return its serialized response."""
+        async def produce() -> bytes:
+            response = await self.handle(request)
+            return response.model_dump_json().encode()
+        
+        return await idempotency_cache.run(request.conversation_id, key, produce)
+
+
+chat_handler = ChatHandler()
@@ -0,0 +1,44 @@
+from backend.core import get_cpu_profiler, request_id_var, resolve_request_id
+from backend.core.tracing import get_tracer
+
+REQUEST_ID_HEADER = "x-request-id"
+tracer = get_tracer()
+cpu_profiler = get_cpu_profiler()
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware that binds a request id and the route's root span for the whole request."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+        
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        request_id = resolve_request_id(headers.get(REQUEST_ID_HEADER))
+        
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER.encode(), request_id.encode())]
+                if span:
+                    span.attributes["status_code"] = message["status"]
+            await send(message)
+        
+        token = request_id_var.set(request_id)
+        cpu_profiler.bind_request(scope)
+        try:
+            # WebSocket connections are long-lived, so their turns get spans of their own instead.
+            if scope["type"] == "websocket":
+                span = None
+                return await self.app(scope, receive, send_with_request_id)
+            
+            with tracer.server_span(
+                f"{scope['method']} {scope['path']}", headers.get("traceparent"), headers.get("tracestate")
+            ) as span:
+                await self.app(scope, receive, send_with_request_id)
+                if span and scope.get("route") is not None:
+                    span.name = f"{scope['method']} {scope['route'].path}"
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,9 @@
+from fastapi import Response
+
+
+class RawJSONResponse(Response):
+    """Sends already-encoded JSON bytes as-is, skipping validation and re-serialization."""
+    media_type = "application/json"
+    
+    def render(self, content: bytes) -> bytes:
+        return content
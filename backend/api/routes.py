@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Header, Request, Response
 from datetime import datetime
-from agents import Runner
+from typing import Awaitable, Optional
 from backend.api.schemas import (
     CreateSessionResponse,
     CreateConversationRequest,
@@ -9,25 +10,25 @@ from backend.api.schemas import (
     ChatResponse,
     ConversationHistoryResponse,
     HealthResponse,
-    QuickActionButton
+    MetricsResponse,
+    TracesResponse,
+    UsageResponse
 )
-from backend.services import session_manager
-from backend.agents import create_main_agent
-from backend.agents.greeting_manager import greeting_manager
-from backend.agents.widget_manager import widget_manager
-from backend.core import get_logger
+from backend.api.chat_handler import chat_handler
+from backend.api.responses import RawJSONResponse
+from backend.api.websocket import ws_router
+from backend.api.admin import admin_router
+from backend.services import session_manager, usage_tracker, model_client
+from backend.core import get_logger, get_metrics, get_loop_monitor, get_settings
+from backend.core.tracing import get_tracer
 
 logger = get_logger("routes")
+metrics = get_metrics()
+settings = get_settings()
+tracer = get_tracer()
 router = APIRouter()
-
-main_agent = create_main_agent()
-
-ACTION_PROMPTS = {
-    "find_restaurants": "I'd like to find restaurant locations near me.",
-    "make_reservation": "I want to make a reservation.",
-    "view_offers": "What special offers do you have?",
-    "browse_menu": "Can I see your menu?"
-}
+router.include_router(ws_router)
+router.include_router(admin_router)
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -36,6 +37,63 @@ async def health_check():
     return HealthResponse(status="healthy", timestamp=datetime.now())
 
 
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics_snapshot():
+    return MetricsResponse(
+        counters=metrics.snapshot(),
+        rates={
+            "widget_misfire_rate": metrics.ratio("widgets.misfire", "reservations.turns"),
+            "extra_turn_rate": metrics.ratio("reservations.extra_turns", "reservations.turns"),
+            "fallback_widget_rate": metrics.ratio("widgets.emitted.fallback", "widgets.emitted"),
+            "turns_per_completed_booking": metrics.ratio("reservations.turns", "reservations.completed"),
+            "cached_token_ratio": metrics.ratio("tokens.cached", "tokens.input"),
+            "speculation_hit_rate": metrics.ratio("speculation.hits", "speculation.prefetched"),
+            "handoff_token_savings": metrics.ratio("handoffs.tokens_saved", "handoffs.tokens_before")
+        },
+        loop=get_loop_monitor().stats(),
+        model_client=model_client.pool_stats()
+    )
+
+
+@router.get("/usage", response_model=UsageResponse)
+async def get_usage_summary():
+    return UsageResponse(scope="global", usage=usage_tracker.summary())
+
+
+@router.get("/usage/{session_id}", response_model=UsageResponse)
+async def get_session_usage(session_id: str):
+    usage = usage_tracker.session_usage(session_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail="No usage recorded for session")
+    return UsageResponse(scope="session", usage=usage)
+
+
+@router.get("/usage/{session_id}/{conversation_id}", response_model=UsageResponse)
+async def get_conversation_usage(session_id: str, conversation_id: str):
+    conversation = session_manager.get_conversation(session_id, conversation_id)
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    turns = [msg.metadata["usage"] for msg in conversation.messages if "usage" in msg.metadata]
+    return UsageResponse(
+        scope="conversation",
+        usage={"total": usage_tracker.conversation_usage(conversation_id), "turns": turns}
+    )
+
+
+@router.get("/traces/slow", response_model=TracesResponse)
+async def get_slow_traces(limit: int = 10, min_duration_ms: float = 0):
+    return TracesResponse(traces=tracer.slow_traces(limit, min_duration_ms))
+
+
+@router.get("/traces/{trace_id}", response_model=TracesResponse)
+async def get_trace(trace_id: str):
+    trace = tracer.get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found or already evicted")
+    return TracesResponse(traces=[trace])
+
+
 @router.post("/session", response_model=CreateSessionResponse)
 async def create_session():
     logger.info("Creating new session")
@@ -45,111 +103,53 @@ async def create_session():
 
 @router.post("/conversation", response_model=CreateConversationResponse)
 async def create_conversation(request: CreateConversationRequest):
-    logger.info(f"Creating conversation in session: {request.session_id}")
-    
-    conversation_id = session_manager.create_conversation(request.session_id)
-    if not conversation_id:
-        logger.error(f"Session not found: {request.session_id}")
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    greeting_message, buttons = greeting_manager.generate_initial_greeting()
-    
-    conversation = session_manager.get_conversation(request.session_id, conversation_id)
-    conversation.add_message("assistant", greeting_message, {"buttons": [b for b in buttons]})
-    
-    logger.info(f"Added initial greeting to conversation {conversation_id}")
+    logger.info("Creating conversation in session: %s", request.session_id)
+    return chat_handler.open_conversation(request.session_id)
+
+
+async def cancel_on_disconnect(http_request: Request, turn: Awaitable):
+    """Await the turn, cancelling it as soon as the client disconnects (e.g. a closed tab or client timeout)."""
+    task = asyncio.ensure_future(turn)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.disconnect_poll_seconds)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                break
+    finally:
+        task.cancel()
     
-    return CreateConversationResponse(
-        conversation_id=conversation_id,
-        initial_message=greeting_message,
-        buttons=[QuickActionButton(**btn) for btn in buttons]
-    )
+    logger.info("Client disconnected, cancelled the in-flight chat turn")
+    metrics.increment("chat.client_disconnects")
+    await asyncio.gather(task, return_exceptions=True)
+    # Nobody reads this; 499 (client closed request) keeps logs and traffic stats honest
+    return Response(status_code=499)
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    logger.info(f"Chat request: session={request.session_id}, conversation={request.conversation_id}")
+async def chat(http_request: Request, request: ChatRequest, idempotency_key: Optional[str] = Header(None)):
+    logger.info("Chat request: session=%s, conversation=%s", request.session_id, request.conversation_id)
     
-    conversation = session_manager.get_conversation(
-        request.session_id, 
-        request.conversation_id
-    )
+    key = idempotency_key or request.idempotency_key
+    if not key:
+        return await cancel_on_disconnect(http_request, chat_handler.handle(request))
     
-    if not conversation:
-        logger.error(f"Conversation not found: {request.conversation_id}")
-        raise HTTPException(status_code=404, detail="Conversation not found")
-    
-    user_message = request.message
-    
-    if request.widget_data:
-        formatted_widget = widget_manager.format_widget_response(request.widget_data)
-        user_message = formatted_widget
-        logger.info(f"Widget data converted to: {user_message}")
-    elif request.action and request.action in ACTION_PROMPTS:
-        user_message = ACTION_PROMPTS[request.action]
-        logger.info(f"Button action {request.action} converted to: {user_message}")
-    
-    conversation.add_message("user", user_message, request.metadata)
-    
-    try:
-        all_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in conversation.messages
-        ]
-        
-        result = await Runner.run(
-            main_agent,
-            input=all_messages
-        )
-        
-        response_text = result.final_output
-        
-        conversation.add_message("assistant", response_text)
-        
-        reservation_step = widget_manager.detect_reservation_step(response_text)
-        response_buttons = None
-        
-        if reservation_step:
-            widgets = widget_manager.create_reservation_widgets(reservation_step)
-            response_buttons = [QuickActionButton(**w) for w in widgets]
-            logger.info(f"Added {len(widgets)} widget(s) for step: {reservation_step}")
-        
-        logger.debug(f"Generated response for conversation {request.conversation_id}")
-        
-        return ChatResponse(
-            response=response_text,
-            conversation_id=request.conversation_id,
-            timestamp=datetime.now(),
-            buttons=response_buttons
-        )
-        
-    except Exception as e:
-        logger.error(f"Error running agent: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    result = await cancel_on_disconnect(http_request, chat_handler.handle_idempotent(request, key))
+    if isinstance(result, Response):
+        return result
+    body, replayed = result
+    return RawJSONResponse(body, headers={"Idempotent-Replayed": "true" if replayed else "false"})
 
 
 @router.get("/conversation/{session_id}/{conversation_id}", response_model=ConversationHistoryResponse)
 async def get_conversation_history(session_id: str, conversation_id: str):
-    logger.info(f"Fetching conversation history: {conversation_id}")
+    logger.info("Fetching conversation history: %s", conversation_id)
     
     conversation = session_manager.get_conversation(session_id, conversation_id)
     
     if not conversation:
-        logger.error(f"Conversation not found: {conversation_id}")
+        logger.error("Conversation not found: %s", conversation_id)
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    messages = [
-        {
-            "role": msg.role,
-            "content": msg.content,
-            "timestamp": msg.timestamp.isoformat(),
-            "metadata": msg.metadata
-        }
-        for msg in conversation.messages
-    ]
-    
-    return ConversationHistoryResponse(
-        conversation_id=conversation_id,
-        messages=messages
-    )
-
+    return RawJSONResponse(conversation.history_json())
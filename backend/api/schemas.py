@@ -35,6 +35,7 @@ class ChatRequest(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
     action: Optional[str] = None
     widget_data: Optional[Dict[str, Any]] = None
+    idempotency_key: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
@@ -53,3 +54,43 @@ class HealthResponse(BaseModel):
     status: str
     timestamp: datetime
 
+
+
+class MetricsResponse(BaseModel):
+    counters: Dict[str, float]
+    rates: Dict[str, float]
+    loop: Dict[str, Any] = {}
+    model_client: Dict[str, Any] = {}
+
+
+class UsageResponse(BaseModel):
+    scope: str
+    usage: Dict[str, Any]
+
+
+class TracesResponse(BaseModel):
+    traces: List[Dict[str, Any]]
+
+
+class MemoryResponse(BaseModel):
+    total: Dict[str, int]
+    process: Dict[str, Any]
+    sessions: List[Dict[str, Any]]
+    top_conversations: List[Dict[str, Any]]
+    tracemalloc: Dict[str, Any]
+
+
+class CpuProfileResponse(BaseModel):
+    seconds: float
+    interval_ms: float
+    sampler: Literal["signal", "thread"]
+    samples: int
+    routes: List[Dict[str, Any]]
+    collapsed: List[str]
+
+
+class HeapDiffResponse(BaseModel):
+    status: Literal["started", "diff", "stopped"]
+    group_by: Literal["module", "package"] = "module"
+    total_diff_bytes: int = 0
+    top: List[Dict[str, Any]] = []
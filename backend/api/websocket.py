@@ -0,0 +1,174 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from backend.api.chat_handler import chat_handler
+from backend.api.schemas import ChatRequest
+from backend.services import session_manager
+from backend.agents.greeting_manager import greeting_manager
+from backend.core import get_logger, get_metrics, get_settings, redact, request_id_var, resolve_request_id
+from backend.core.tracing import get_tracer
+
+logger = get_logger("websocket")
+metrics = get_metrics()
+settings = get_settings()
+tracer = get_tracer()
+ws_router = APIRouter()
+
+RETURN_GREETING_AFTER_MINUTES = 5
+
+
+class ChatConnection:
+    """One multiplexed client connection carrying chat turns, widget submissions, pushed events and heartbeats."""
+    
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.session_id: Optional[str] = None
+        self.conversation_id: Optional[str] = None
+        self.last_seen = time.monotonic()
+        self._send_lock = asyncio.Lock()
+        self._turn_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def send(self, event_type: str, **payload: Any) -> bool:
+        try:
+            async with self._send_lock:
+                await self.websocket.send_json({"type": event_type, **payload})
+            return True
+        except (WebSocketDisconnect, RuntimeError):
+            logger.warning("Dropped %s event for closed connection %s", event_type, self.conversation_id)
+            return False
+    
+    async def bootstrap(self, session_id: Optional[str], conversation_id: Optional[str]):
+        """Resume an existing conversation or create session and conversation in one handshake."""
+        conversation = (
+            session_manager.get_conversation(session_id, conversation_id)
+            if session_id and conversation_id else None
+        )
+        
+        if conversation:
+            self.session_id, self.conversation_id = session_id, conversation_id
+            await self.send("session", session_id=session_id, conversation_id=conversation_id, resumed=True)
+            if conversation.is_inactive(minutes=RETURN_GREETING_AFTER_MINUTES):
+                minutes_inactive = int((datetime.now() - conversation.last_activity).total_seconds() // 60)
+                message = greeting_manager.generate_return_greeting(minutes_inactive)
+                conversation.add_message("assistant", message)
+                await self.send("return_greeting", message=message)
+            return
+        
+        if not session_id or not session_manager.get_session(session_id):
+            session_id = session_manager.create_session()
+        opened = chat_handler.open_conversation(session_id)
+        self.session_id, self.conversation_id = session_id, opened.conversation_id
+        
+        await self.send("session", session_id=session_id, conversation_id=opened.conversation_id, resumed=False)
+        await self.send(
+            "greeting",
+            message=opened.initial_message,
+            buttons=[button.model_dump() for button in opened.buttons]
+        )
+    
+    async def handle_turn(self, frame: Dict[str, Any]):
+        frame_id = frame.get("id")
+        request_id_var.set(resolve_request_id(frame.get("request_id")))
+        with tracer.server_span("WS chat", frame.get("traceparent"), frame.get("tracestate")):
+            try:
+                request = ChatRequest(
+                    session_id=self.session_id,
+                    conversation_id=self.conversation_id,
+                    message=frame.get("message", ""),
+                    metadata=frame.get("metadata"),
+                    action=frame.get("action"),
+                    widget_data=frame.get("widget_data"),
+                    idempotency_key=frame.get("idempotency_key")
+                )
+                async with self._turn_lock:
+                    payload = await self._run_turn(request)
+                await self.send("response", id=frame_id, **payload)
+            except ValidationError as e:
+                await self.send("error", id=frame_id, status=422, detail=str(e))
+            except HTTPException as e:
+                await self.send("error", id=frame_id, status=e.status_code, detail=e.detail)
+            except Exception as e:
+                # Spawned task: without a reply the client would wait out its timeout for this frame id
+                logger.error("Chat frame %s failed: %s", frame_id, redact(e))
+                await self.send("error", id=frame_id, status=500, detail="Internal error while processing the message")
+    
+    async def _run_turn(self, request: ChatRequest) -> Dict[str, Any]:
+        if not request.idempotency_key:
+            response = await chat_handler.handle(request)
+            return response.model_dump(mode="json")
+        
+        body, _ = await chat_handler.handle_idempotent(request, request.idempotency_key)
+        return json.loads(body)
+    
+    def spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    def cancel_turns(self):
+        """Stop runs nobody can receive anymore; the chat handler rolls back their user messages."""
+        running = [task for task in self._tasks if not task.done()]
+        for task in running:
+            task.cancel()
+        if running:
+            metrics.increment("ws.cancelled_turns", len(running))
+            logger.info("Cancelled %s in-flight turn(s) for closed connection %s", len(running), self.conversation_id)
+    
+    async def heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.ws_heartbeat_interval_seconds)
+            if time.monotonic() - self.last_seen > settings.ws_heartbeat_timeout_seconds:
+                logger.warning("Heartbeat timeout, closing connection for conversation %s", self.conversation_id)
+                metrics.increment("ws.heartbeat_timeouts")
+                await self.websocket.close(code=1001)
+                return
+            await self.send("ping", timestamp=datetime.now().isoformat())
+
+
+@ws_router.websocket("/ws")
+async def chat_socket(websocket: WebSocket, session_id: Optional[str] = None, conversation_id: Optional[str] = None):
+    await websocket.accept()
+    metrics.increment("ws.connections")
+    connection = ChatConnection(websocket)
+    
+    try:
+        await connection.bootstrap(session_id, conversation_id)
+    except HTTPException as e:
+        await connection.send("error", status=e.status_code, detail=e.detail)
+        await websocket.close(code=1008)
+        return
+    
+    logger.info("WebSocket connected: session=%s, conversation=%s", connection.session_id, connection.conversation_id)
+    heartbeat = asyncio.create_task(connection.heartbeat())
+    
+    try:
+        while True:
+            raw_frame = await websocket.receive_text()
+            connection.last_seen = time.monotonic()
+            metrics.increment("ws.frames")
+            
+            try:
+                frame = json.loads(raw_frame)
+            except json.JSONDecodeError:
+                frame = None
+            if not isinstance(frame, dict):
+                await connection.send("error", status=400, detail="Frames must be JSON objects")
+                continue
+            
+            frame_type = frame.get("type")
+            if frame_type == "ping":
+                await connection.send("pong", id=frame.get("id"))
+            elif frame_type in ("chat", "widget"):
+                connection.spawn(connection.handle_turn(frame))
+            elif frame_type != "pong":
+                await connection.send("error", id=frame.get("id"), status=400, detail=f"Unknown frame type: {frame_type}")
+    except WebSocketDisconnect:
+        logger.info("WebSocket disconnected: conversation=%s", connection.conversation_id)
+    finally:
+        heartbeat.cancel()
+        connection.cancel_turns()
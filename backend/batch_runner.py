@@ -0,0 +1,192 @@
+"""Run scripted conversations through the chat agents in-process and stream results to JSONL.
+
+Usage: python -m backend.batch_runner conversations.jsonl --output results.jsonl
+       [--concurrency 20] [--rate 10] [--limit 100] [--deadline 60] [--no-resume]
+
+Each input line is {"id": "...", "turns": ["hi", {"action": "make_reservation"}, {"widget_data": {...}}]};
+plain strings are user messages. Conversations already answered successfully in the output file are
+skipped, so an interrupted batch picks up where it stopped; failed or degraded ones run again and their
+new record is appended after the old one.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Set, TextIO
+
+from fastapi import HTTPException
+from backend.api.chat_handler import chat_handler
+from backend.api.schemas import ChatRequest
+from backend.core import get_logger, get_settings
+from backend.services import agent_runner, model_client, session_manager, speculator
+
+logger = get_logger("batch_runner")
+settings = get_settings()
+
+
+class RateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart across all callers."""
+    
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Conversation ids already answered successfully in the output file; a truncated last line is ignored."""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok" and "id" in record:
+                done.add(record["id"])
+    return done
+
+
+def ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def load_conversations(path: str, skip: Set[str], limit: Optional[int]) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if limit is not None and line_number > limit:
+                return
+            if not line.strip():
+                continue
+            conversation = json.loads(line)
+            conversation.setdefault("id", str(line_number))
+            if conversation["id"] not in skip:
+                yield conversation
+
+
+def turn_request(session_id: str, conversation_id: str, turn: Any) -> ChatRequest:
+    if isinstance(turn, str):
+        turn = {"message": turn}
+    return ChatRequest(
+        session_id=session_id,
+        conversation_id=conversation_id,
+        message=turn.get("message") or "",
+        action=turn.get("action"),
+        widget_data=turn.get("widget_data")
+    )
+
+
+class BatchRunner:
+    def __init__(self, output: TextIO, rate: Optional[float]):
+        self.output = output
+        self.rate_limiter = RateLimiter(rate)
+        self.counts = {"ok": 0, "degraded": 0, "error": 0}
+    
+    async def run_all(self, conversations: Iterator[Dict[str, Any]], concurrency: int):
+        # Bounded queue so a huge input file is streamed rather than loaded up front
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        
+        async def worker():
+            while (conversation := await queue.get()) is not None:
+                await self.run_conversation(conversation)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        for conversation in conversations:
+            await queue.put(conversation)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    
+    async def run_conversation(self, conversation: Dict[str, Any]):
+        started = time.perf_counter()
+        session_id = session_manager.create_session()
+        record: Dict[str, Any] = {"id": conversation["id"], "status": "ok", "turns": []}
+        conversation_id = ""
+        try:
+            conversation_id = chat_handler.open_conversation(session_id).conversation_id
+            for turn in conversation.get("turns", []):
+                await self.rate_limiter.acquire()
+                request = turn_request(session_id, conversation_id, turn)
+                turn_started = time.perf_counter()
+                response = await chat_handler.handle(request)
+                last = session_manager.get_conversation(session_id, conversation_id).messages[-1]
+                record["turns"].append({
+                    "input": request.model_dump(include={"message", "action", "widget_data"}, exclude_none=True),
+                    "response": response.response,
+                    "buttons": [button.action for button in response.buttons or []],
+                    "latency_ms": round((time.perf_counter() - turn_started) * 1000, 1),
+                    "usage": last.metadata.get("usage")
+                })
+                if last.metadata.get("degraded"):
+                    # The circuit breaker answered instead of the model; not a usable result, so retry on resume
+                    record.update(status="degraded", error="model circuit breaker open, canned answer served")
+                    break
+        except HTTPException as e:
+            record.update(status="error", error=f"{e.status_code}: {e.detail}")
+        except Exception as e:
+            logger.error("Conversation %s failed: %s", conversation["id"], e)
+            record.update(status="error", error=str(e))
+        finally:
+            speculator.cancel(conversation_id)
+            session_manager.delete_session(session_id)
+        
+        record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.counts[record["status"]] += 1
+        # Single event loop, so whole-line writes never interleave; flush keeps the file usable as a checkpoint
+        self.output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.output.flush()
+
+
+async def run(args: argparse.Namespace):
+    if args.deadline:
+        settings.chat_deadline_seconds = args.deadline
+    skip = completed_ids(args.output) if args.resume else set()
+    if skip:
+        print(f"Resuming: {len(skip)} conversations already answered in {args.output}")
+    
+    agent_runner.use_openai_client(model_client.start())
+    started = time.perf_counter()
+    with open(args.output, "a" if args.resume else "w", encoding="utf-8") as output:
+        if output.tell() and not ends_with_newline(args.output):
+            # Terminate a line cut short by an interrupted run so the next record starts cleanly
+            output.write("\n")
+        runner = BatchRunner(output, args.rate)
+        await runner.run_all(load_conversations(args.input, skip, args.limit), args.concurrency)
+    await speculator.shutdown()
+    await model_client.close()
+    
+    total = sum(runner.counts.values())
+    elapsed = time.perf_counter() - started
+    print(f"conversations={total} ok={runner.counts['ok']} degraded={runner.counts['degraded']} error={runner.counts['error']} "
+          f"elapsed={elapsed:.1f}s throughput={total / elapsed if elapsed else 0:.2f} conversations/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL file with one scripted conversation per line")
+    parser.add_argument("--output", required=True, help="JSONL results file, appended to and used as the checkpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="max conversations in flight")
+    parser.add_argument("--rate", type=float, default=None, help="max turns started per second across all conversations")
+    parser.add_argument("--limit", type=int, default=None, help="read only the first N input lines")
+    parser.add_argument("--deadline", type=float, default=None, help="per-turn deadline in seconds, overrides CHAT_DEADLINE_SECONDS")
+    parser.add_argument("--no-resume", dest="resume", action="store_false", help="overwrite the output instead of resuming")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
-from .config import get_settings
-from .logger import get_logger
-
-__all__ = ["get_settings", "get_logger"]
+from .config import get_settings, AgentProfile, HandoffPolicy
+from .logger import get_logger, redact
+from .request_context import get_request_id, request_id_var, resolve_request_id
+from .metrics import get_metrics
+from .loop_monitor import get_loop_monitor
+from .heap_profiler import get_heap_profiler
+from .cpu_profiler import get_cpu_profiler
 
+__all__ = ["get_settings", "AgentProfile", "HandoffPolicy", "get_logger", "redact", "get_request_id", "request_id_var", "resolve_request_id", "get_metrics", "get_loop_monitor", "get_heap_profiler", "get_cpu_profiler"]
@@ -1,19 +1,146 @@
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List, Literal, Optional
+
+
+class AgentProfile(BaseModel):
+    tier: str = "standard"
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+
+class HandoffPolicy(BaseModel):
+    filters: List[Literal["drop_tools", "drop_greeting", "last_turns", "keep_slots"]] = ["drop_tools", "drop_greeting"]
+    last_turns: int = 3
 
 
 class Settings(BaseSettings):
     openai_api_key: str
     openai_model: str = "gpt-4o-mini"
+    openai_base_url: Optional[str] = None
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry_seconds: float = 60.0
+    openai_connect_timeout_seconds: float = 5.0
+    openai_read_timeout_seconds: float = 60.0
+    openai_http2: bool = False
+    openai_max_retries: int = 2
+    model_cassette_mode: Literal["off", "record", "replay"] = "off"
+    model_cassette_path: str = "logs/cassettes/model_calls.jsonl"
+    model_cassette_latency: Literal["original", "zero"] = "zero"
+    prompt_cache_key: str = "restaurant-chat"
+    # The standard tier defaults to OPENAI_MODEL unless MODEL_TIERS names it explicitly
+    model_tiers: Dict[str, str] = {
+        "fast": "gpt-4.1-nano"
+    }
+    agent_profiles: Dict[str, AgentProfile] = {
+        "MainAgent": AgentProfile(tier="fast", temperature=0.0, max_tokens=200),
+        "ReservationAgent": AgentProfile(tier="fast", temperature=0.2, max_tokens=300),
+        "LocationAgent": AgentProfile(tier="fast", temperature=0.3, max_tokens=400),
+        "OffersAgent": AgentProfile(tier="fast", temperature=0.3, max_tokens=400),
+        "InfoAgent": AgentProfile(tier="fast", temperature=0.0, max_tokens=300),
+        "MenuAgent": AgentProfile(tier="standard", temperature=0.7, max_tokens=600)
+    }
+    handoff_policies: Dict[str, HandoffPolicy] = {
+        "ReservationAgent": HandoffPolicy(filters=["drop_tools", "drop_greeting", "last_turns", "keep_slots"], last_turns=2),
+        "LocationAgent": HandoffPolicy(filters=["drop_tools", "drop_greeting", "last_turns"], last_turns=2),
+        "OffersAgent": HandoffPolicy(filters=["drop_tools", "drop_greeting", "last_turns"], last_turns=1),
+        "InfoAgent": HandoffPolicy(filters=["drop_tools", "drop_greeting", "last_turns"], last_turns=1),
+        "MenuAgent": HandoffPolicy(filters=["drop_tools", "drop_greeting", "last_turns"], last_turns=4)
+    }
+    model_pricing: Dict[str, Dict[str, float]] = {
+        "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+        "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+        "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+        "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60}
+    }
     
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
     log_level: str = "DEBUG"
+    log_format: Literal["json", "text"] = "json"
+    log_debug_sample_rate: float = 0.1
+    log_max_body_chars: int = 120
+    
+    ws_heartbeat_interval_seconds: float = 20.0
+    ws_heartbeat_timeout_seconds: float = 60.0
+    
+    idempotency_ttl_seconds: float = 600.0
+    idempotency_max_entries: int = 10000
+    
+    run_state_mode: Literal["transcript", "session"] = "transcript"
+    disconnect_poll_seconds: float = 0.25
+    chat_deadline_seconds: float = 30.0
+    hedge_enabled: bool = False
+    hedge_after_seconds: float = 8.0
+    fallback_model: str = "gpt-4o-mini"
+    breaker_failure_threshold: int = 5
+    breaker_latency_threshold_seconds: float = 20.0
+    breaker_reset_seconds: float = 30.0
+    
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_seconds: float = 0.1
+    loop_block_threshold_ms: float = 100.0
+    tool_offload_mode: Literal["off", "auto", "always"] = "auto"
+    tool_offload_threshold_ms: float = 5.0
+    tool_offload_workers: int = 8
+    tool_timeout_seconds: float = 5.0
+    tool_timeouts: Dict[str, float] = {"check_availability": 8.0}
+    tool_pool_size: int = 16
+    tool_cache_ttl_seconds: Dict[str, float] = {
+        "get_menu": 300.0,
+        "get_restaurant_hours": 300.0,
+        "get_location_and_contact": 300.0,
+        "get_special_offers": 300.0,
+        "find_nearby_restaurants": 300.0,
+        "check_availability": 30.0
+    }
+    tool_cache_max_entries: int = 5000
+    
+    speculation_enabled: bool = True
+    speculation_max_calls_per_turn: int = 6
+    speculation_max_concurrency: int = 4
+    speculation_delay_seconds: float = 0.05
+    
+    tracing_enabled: bool = True
+    trace_buffer_size: int = 200
+    trace_export_path: Optional[str] = None
+    
+    traffic_capture_enabled: bool = False
+    traffic_capture_path: str = "logs/capture/traffic.jsonl"
+    traffic_capture_verbatim: bool = False
+    
+    analytics_enabled: bool = False
+    analytics_path: str = "logs/analytics"
+    analytics_queue_size: int = 10000
+    analytics_batch_rows: int = 1000
+    analytics_flush_seconds: float = 5.0
+    analytics_max_file_mb: int = 64
+    analytics_rollover_seconds: float = 3600.0
+    
+    admin_token: Optional[str] = None
+    tracemalloc_frames: int = 1
+    cpu_profile_max_seconds: float = 60.0
+    
+    @model_validator(mode="after")
+    def default_standard_tier(self) -> "Settings":
+        self.model_tiers.setdefault("standard", self.openai_model)
+        return self
+    
+    def agent_model(self, agent_name: str) -> str:
+        """Model of the tier configured for an agent, or OPENAI_MODEL."""
+        profile = self.agent_profiles.get(agent_name, AgentProfile())
+        return self.model_tiers.get(profile.tier, self.openai_model)
+    
+    def model_tier(self, model: str) -> str:
+        return next((tier for tier, tier_model in self.model_tiers.items() if tier_model == model), "custom")
     
     class Config:
         env_file = ".env"
         case_sensitive = False
         extra = "ignore"
+        protected_namespaces = ("settings_",)
 
 
 @lru_cache()
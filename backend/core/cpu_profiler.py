@@ -0,0 +1,169 @@
+import asyncio
+import signal
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from .heap_profiler import module_name
+from .logger import get_logger
+
+logger = get_logger("cpu_profiler")
+
+# The ASGI scope of the request a task works for; the router fills in scope["route"] once it matches.
+request_scope_var: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+
+MAX_STACK_DEPTH = 200
+# Thread-sampler fallback only: a short switch interval lets the sampler preempt a busy loop thread
+FALLBACK_SWITCH_INTERVAL = 0.0005
+
+
+def route_label(scope: Optional[Dict[str, Any]]) -> str:
+    if scope is None:
+        return "(background)"
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "?")
+    return f"{scope.get('method', 'WS')} {path}"
+
+
+class CpuProfiler:
+    """Sampling profiler that attributes event-loop CPU samples to the routes whose tasks were running.
+    
+    The loop thread is sampled from a SIGPROF handler, which runs on that thread between bytecodes, so busy
+    request tasks are caught mid-work. A timer thread samples the other threads (all_threads); it also samples
+    the loop when signals are unavailable (loop off the main thread, Windows), where it only gets the GIL at
+    thread switches and so over-reports idle time despite a shortened switch interval.
+    
+    Each request's task is registered with its scope, and while a profile runs a task factory propagates the
+    scope to tasks the request spawns (agent runs, tool calls), so their samples land under the same route.
+    """
+    
+    def __init__(self):
+        self._task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._frame_labels: Dict[Any, str] = {}
+        self.running = False
+    
+    def bind_request(self, scope: Dict[str, Any]):
+        """Called by the request middleware for every request, before the app runs."""
+        request_scope_var.set(scope)
+        task = asyncio.current_task()
+        if task is not None:
+            self._task_scopes[task] = scope
+    
+    async def profile(self, seconds: float, interval_ms: float, all_threads: bool = False) -> Dict[str, Any]:
+        """Sample for `seconds` and return per-route sample counts plus collapsed stacks (route as root frame)."""
+        if self.running:
+            raise RuntimeError("A CPU profile is already running")
+        self.running = True
+        loop = asyncio.get_running_loop()
+        interval = interval_ms / 1000
+        use_signal = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+        previous_factory = loop.get_task_factory()
+        previous_switch_interval = sys.getswitchinterval()
+        loop.set_task_factory(self._task_factory(previous_factory))
+        loop_counts: Counter = Counter()
+        thread_counts: Counter = Counter()
+        stop = threading.Event()
+        sampler = None
+        
+        if use_signal:
+            previous_handler = signal.signal(
+                signal.SIGPROF, lambda signum, frame: self._sample_loop(loop, frame, loop_counts)
+            )
+            signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        else:
+            sys.setswitchinterval(min(previous_switch_interval, FALLBACK_SWITCH_INTERVAL))
+        if all_threads or not use_signal:
+            sampler = threading.Thread(
+                target=self._sample_threads,
+                args=(loop, threading.get_ident(), interval, all_threads, not use_signal, stop, thread_counts),
+                name="cpu-profiler",
+                daemon=True
+            )
+            sampler.start()
+        started = time.perf_counter()
+        logger.info("CPU profile started for %ss at %sms (%s sampler)", seconds, interval_ms, "signal" if use_signal else "thread")
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            if use_signal:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+                signal.signal(signal.SIGPROF, previous_handler)
+            stop.set()
+            if sampler:
+                await asyncio.to_thread(sampler.join)
+            sys.setswitchinterval(previous_switch_interval)
+            loop.set_task_factory(previous_factory)
+            # Labels are keyed by code object; dropping them lets reloaded or generated code be collected
+            self._frame_labels.clear()
+            self.running = False
+        
+        counts = loop_counts + thread_counts
+        routes: Counter = Counter()
+        for stack, samples in counts.items():
+            routes[stack.split(";", 1)[0]] += samples
+        total = sum(routes.values())
+        return {
+            "seconds": round(time.perf_counter() - started, 3),
+            "interval_ms": interval_ms,
+            "sampler": "signal" if use_signal else "thread",
+            "samples": total,
+            "routes": [
+                {"route": route, "samples": samples, "share": round(samples / total, 4)}
+                for route, samples in routes.most_common()
+            ],
+            "collapsed": [f"{stack} {samples}" for stack, samples in counts.most_common()]
+        }
+    
+    def _task_factory(self, previous_factory):
+        def factory(loop, coro, context=None):
+            kwargs = {"context": context} if context is not None else {}
+            task = previous_factory(loop, coro, **kwargs) if previous_factory else asyncio.Task(coro, loop=loop, **kwargs)
+            scope = context.get(request_scope_var) if context is not None else request_scope_var.get()
+            if scope is not None:
+                self._task_scopes[task] = scope
+            return task
+        return factory
+    
+    def _sample_loop(self, loop, frame, counts: Counter):
+        task = asyncio.tasks._current_tasks.get(loop)
+        label = route_label(self._task_scopes.get(task)) if task is not None else "(idle)"
+        counts[f"{label};{self._collapse(frame)}"] += 1
+    
+    def _sample_threads(
+        self, loop, loop_thread: int, interval: float, all_threads: bool, include_loop: bool, stop: threading.Event, counts: Counter
+    ):
+        own_thread = threading.get_ident()
+        while not stop.wait(interval):
+            frames = sys._current_frames()
+            if include_loop and loop_thread in frames:
+                self._sample_loop(loop, frames[loop_thread], counts)
+            if not all_threads:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id not in (own_thread, loop_thread):
+                    counts[f"(thread {names.get(thread_id, thread_id)});{self._collapse(frame)}"] += 1
+    
+    def _collapse(self, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            label = self._frame_labels.get(code)
+            if label is None:
+                label = self._frame_labels[code] = f"{module_name(code.co_filename)}:{code.co_qualname}"
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+
+_profiler: Optional[CpuProfiler] = None
+
+
+def get_cpu_profiler() -> CpuProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = CpuProfiler()
+    return _profiler
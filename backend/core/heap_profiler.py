@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from .config import get_settings
+from .logger import get_logger
+
+logger = get_logger("heap_profiler")
+
+
+def module_name(filename: str) -> str:
+    """Map a source path to its dotted module name using the longest matching sys.path entry."""
+    path = os.path.abspath(filename)
+    for root in sorted((os.path.abspath(p) for p in sys.path if p), key=len, reverse=True):
+        if path.startswith(root + os.sep):
+            relative = os.path.splitext(path[len(root) + 1:])[0]
+            return relative.replace(os.sep, ".").removesuffix(".__init__")
+    return filename
+
+
+class HeapProfiler:
+    """On-demand tracemalloc snapshots diffed against the previous one and grouped by module or package."""
+    
+    def __init__(self, frames: int):
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+    
+    def status(self) -> Dict[str, Any]:
+        if not self.tracing:
+            return {"tracing": False}
+        current, peak = tracemalloc.get_traced_memory()
+        return {"tracing": True, "traced_bytes": current, "traced_peak_bytes": peak, "has_baseline": self._baseline is not None}
+    
+    def snapshot_diff(self, top: int = 20, group_by: str = "module") -> Dict[str, Any]:
+        """Start tracing on the first call; afterwards diff a new snapshot against the previous one."""
+        with self._lock:
+            if not self.tracing:
+                tracemalloc.start(self.frames)
+                self._baseline = self._take_snapshot()
+                logger.info("tracemalloc started with %s frame(s)", self.frames)
+                return {"status": "started", "group_by": group_by, "total_diff_bytes": 0, "top": []}
+            
+            snapshot = self._take_snapshot()
+            stats = snapshot.compare_to(self._baseline, "filename") if self._baseline else []
+            self._baseline = snapshot
+        
+        groups: Dict[str, Dict[str, int]] = defaultdict(lambda: {"size_diff_bytes": 0, "size_bytes": 0, "count_diff": 0})
+        for stat in stats:
+            name = module_name(stat.traceback[0].filename)
+            if group_by == "package":
+                name = name.split(".", 1)[0]
+            group = groups[name]
+            group["size_diff_bytes"] += stat.size_diff
+            group["size_bytes"] += stat.size
+            group["count_diff"] += stat.count_diff
+        
+        ranked = sorted(groups.items(), key=lambda item: abs(item[1]["size_diff_bytes"]), reverse=True)[:top]
+        return {
+            "status": "diff",
+            "group_by": group_by,
+            "total_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": [{"name": name, **values} for name, values in ranked]
+        }
+    
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ))
+    
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+            if self.tracing:
+                tracemalloc.stop()
+                logger.info("tracemalloc stopped")
+
+
+_profiler: Optional[HeapProfiler] = None
+
+
+def get_heap_profiler() -> HeapProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = HeapProfiler(get_settings().tracemalloc_frames)
+    return _profiler
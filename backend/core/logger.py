@@ -1,7 +1,60 @@
+import json
 import logging
+import re
 import sys
+import zlib
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any, Optional
+from .config import get_settings
+from .request_context import get_request_id
+
+# Attributes every LogRecord carries; anything else was passed via `extra=` and is emitted as a field.
+RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{6,}\d")
+
+
+def redact(value: Any, max_chars: Optional[int] = None) -> str:
+    """Mask contact details and truncate a message body before it reaches the logs."""
+    text = EMAIL_PATTERN.sub("<email>", str(value))
+    text = PHONE_PATTERN.sub(lambda m: "<phone>" if sum(c.isdigit() for c in m.group()) >= 9 else m.group(), text)
+    limit = max_chars if max_chars is not None else get_settings().log_max_body_chars
+    if len(text) > limit:
+        return f"{text[:limit]}…(+{len(text) - limit} chars)"
+    return text
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps each record with the current request id and samples DEBUG records per request."""
+    
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id()
+        if record.levelno > logging.DEBUG or self.debug_sample_rate >= 1:
+            return True
+        # Sampling on the request id keeps or drops all DEBUG lines of a turn together.
+        key = record.request_id or f"{record.created}"
+        return zlib.crc32(key.encode()) % 10000 < self.debug_sample_rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None)
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in RESERVED_ATTRS})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
 
 class LoggerFactory:
@@ -18,20 +71,25 @@ class LoggerFactory:
     
     @classmethod
     def _create_logger(cls, name: str) -> logging.Logger:
+        settings = get_settings()
         logger = logging.getLogger(name)
-        logger.setLevel(logging.DEBUG)
+        logger.setLevel(settings.log_level.upper())
         
         if logger.handlers:
             return logger
         
-        formatter = logging.Formatter(
-            '%(asctime)s | %(name)s | %(levelname)s | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        if settings.log_format == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s | %(name)s | %(levelname)s | %(request_id)s | %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+        context_filter = RequestContextFilter(settings.log_debug_sample_rate)
         
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.DEBUG)
         console_handler.setFormatter(formatter)
+        console_handler.addFilter(context_filter)
         logger.addHandler(console_handler)
         
         log_dir = Path("logs/backend")
@@ -40,8 +98,8 @@ class LoggerFactory:
         file_handler = logging.FileHandler(
             log_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.log"
         )
-        file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
+        file_handler.addFilter(context_filter)
         logger.addHandler(file_handler)
         
         return logger
@@ -49,4 +107,3 @@ class LoggerFactory:
 
 def get_logger(name: str) -> logging.Logger:
     return LoggerFactory.get_logger(name)
-
@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from .config import get_settings
+from .logger import get_logger
+from .metrics import get_metrics
+
+logger = get_logger("loop_monitor")
+metrics = get_metrics()
+
+
+class LoopMonitor:
+    """Measures event-loop scheduling lag and captures the stack of callbacks that block the loop."""
+    
+    def __init__(self, interval_seconds: float, block_threshold_ms: float, window: int = 2048):
+        self.interval_seconds = interval_seconds
+        self.block_threshold_seconds = block_threshold_ms / 1000
+        self._lags: Deque[float] = deque(maxlen=window)
+        self._slow_callbacks: Deque[Dict[str, Any]] = deque(maxlen=20)
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+        logger.info("Loop monitor started (interval=%ss, block threshold=%.0fms)", self.interval_seconds, self.block_threshold_seconds * 1000)
+    
+    async def stop(self):
+        self._stop.set()
+        if self._probe_task:
+            self._probe_task.cancel()
+    
+    async def _probe(self):
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            self._last_tick = time.monotonic()
+            self._lags.append(max(self._last_tick - scheduled - self.interval_seconds, 0))
+    
+    def _watchdog(self):
+        captured_for: Optional[float] = None
+        while not self._stop.wait(self.interval_seconds):
+            last_tick = self._last_tick
+            stalled = time.monotonic() - last_tick - self.interval_seconds
+            if stalled < self.block_threshold_seconds or captured_for == last_tick:
+                continue
+            
+            captured_for = last_tick
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame else []
+            self._slow_callbacks.append({
+                "detected_at": datetime.now().isoformat(),
+                "blocked_ms": round(stalled * 1000),
+                "stack": [line.strip() for line in stack[-12:]]
+            })
+            metrics.increment("loop.blocked_callbacks")
+            logger.warning("Event loop blocked for %.0fms at: %s", stalled * 1000, stack[-1].strip() if stack else 'unknown')
+    
+    def stats(self) -> Dict[str, Any]:
+        lags: List[float] = sorted(self._lags)
+        if not lags:
+            return {"samples": 0, "slow_callbacks": list(self._slow_callbacks)}
+        
+        def percentile(p: float) -> float:
+            return round(lags[min(int(p * len(lags)), len(lags) - 1)] * 1000, 3)
+        
+        return {
+            "samples": len(lags),
+            "lag_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99), "max": round(lags[-1] * 1000, 3)},
+            "slow_callbacks": list(self._slow_callbacks)
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    global _monitor
+    if _monitor is None:
+        settings = get_settings()
+        _monitor = LoopMonitor(settings.loop_monitor_interval_seconds, settings.loop_block_threshold_ms)
+    return _monitor
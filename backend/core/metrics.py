@@ -0,0 +1,35 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+    
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+    
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._counters[name] = value
+    
+    def get(self, name: str) -> float:
+        return self._counters.get(name, 0)
+    
+    def ratio(self, numerator: str, denominator: str) -> float:
+        denominator_value = self.get(denominator)
+        return self.get(numerator) / denominator_value if denominator_value else 0.0
+    
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+
+metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return metrics
@@ -0,0 +1,19 @@
+import re
+from contextvars import ContextVar
+from typing import Optional
+from uuid import uuid4
+
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+def resolve_request_id(candidate: Optional[str] = None) -> str:
+    """Accept a well-formed client-supplied request id, otherwise mint a new one."""
+    if candidate and REQUEST_ID_PATTERN.match(candidate):
+        return candidate
+    return uuid4().hex
@@ -0,0 +1,235 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from .config import get_settings
+from .logger import get_logger
+from .request_context import get_request_id
+
+logger = get_logger("tracing")
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return (trace_id, parent_span_id) from a W3C traceparent header, or None if it is malformed."""
+    match = TRACEPARENT_PATTERN.match((header or "").strip().lower())
+    return (match.group(1), match.group(2)) if match else None
+
+
+def parse_client_start(tracestate: Optional[str]) -> Optional[float]:
+    """Read the epoch-ms turn start the Streamlit client puts in tracestate (`rchat=<ms>`)."""
+    for entry in (tracestate or "").split(","):
+        key, _, value = entry.strip().partition("=")
+        if key == "rchat" and value.isdigit():
+            return int(value) / 1000
+    return None
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    local_root: bool
+    start: float = field(default_factory=time.time)
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    
+    @property
+    def duration_ms(self) -> float:
+        return round(((self.end or time.time()) - self.start) * 1000, 2)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Records spans per trace in memory and hands finished traces to the ring buffer and JSONL exporter."""
+    
+    def __init__(self, enabled: bool, buffer_size: int, export_path: Optional[str], max_open_traces: int = 1000):
+        self.enabled = enabled
+        self.export_path = Path(export_path) if export_path else None
+        self.max_open_traces = max_open_traces
+        self._open: Dict[str, List[Span]] = {}
+        self._finished: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+    
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: Optional[Span] = None,
+        remote_parent: Optional[Tuple[str, str]] = None,
+        **attributes
+    ) -> Optional[Span]:
+        if not self.enabled:
+            return None
+        parent = parent or current_span.get()
+        if parent is not None:
+            span = Span(name, kind, parent.trace_id, _new_id(8), parent.span_id, local_root=False)
+        else:
+            trace_id, parent_id = remote_parent or (_new_id(16), None)
+            span = Span(name, kind, trace_id, _new_id(8), parent_id, local_root=True)
+            span.attributes["request_id"] = get_request_id()
+        span.attributes.update(attributes)
+        
+        with self._lock:
+            spans = self._open.get(span.trace_id)
+            if spans is None:
+                if len(self._open) >= self.max_open_traces:
+                    self._open.pop(next(iter(self._open)))
+                spans = self._open[span.trace_id] = []
+            spans.append(span)
+        return span
+    
+    def end_span(self, span: Optional[Span], error: Optional[BaseException] = None):
+        if span is None or span.end is not None:
+            return
+        span.end = time.time()
+        if error is not None:
+            span.status = "error"
+            span.attributes["error"] = f"{type(error).__name__}: {error}"
+        if span.local_root:
+            self._finish_trace(span)
+    
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        remote_parent: Optional[Tuple[str, str]] = None,
+        **attributes
+    ) -> Iterator[Optional[Span]]:
+        """Open a span as the current span for the enclosed block (sync or async code)."""
+        span = self.start_span(name, kind, remote_parent=remote_parent, **attributes)
+        token = current_span.set(span) if span else None
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        finally:
+            if token is not None:
+                current_span.reset(token)
+            self.end_span(span)
+    
+    @contextmanager
+    def server_span(self, name: str, traceparent: Optional[str], tracestate: Optional[str]) -> Iterator[Optional[Span]]:
+        """Root span for an incoming turn, continuing the client's trace when it sent one."""
+        with self.span(name, kind="server", remote_parent=parse_traceparent(traceparent)) as span:
+            client_start = parse_client_start(tracestate)
+            if span and client_start:
+                span.attributes["client_lead_ms"] = round((span.start - client_start) * 1000, 2)
+            yield span
+    
+    def _finish_trace(self, root: Span):
+        with self._lock:
+            spans = self._open.pop(root.trace_id, [])
+        trace = {
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "started_at": root.start,
+            "duration_ms": root.duration_ms,
+            "status": root.status,
+            "root_span_id": root.span_id,
+            "spans": [span.as_dict() for span in spans]
+        }
+        self._finished.append(trace)
+        if self.export_path:
+            self._export(trace)
+    
+    def _export(self, trace: Dict[str, Any]):
+        try:
+            self.export_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.export_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning("Failed to export trace %s: %s", trace["trace_id"], e)
+    
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        return next((trace for trace in self._finished if trace["trace_id"] == trace_id), None)
+    
+    def slow_traces(self, limit: int = 10, min_duration_ms: float = 0) -> List[Dict[str, Any]]:
+        """Slowest recent traces, each reduced to the chain of spans that determined its latency."""
+        traces = sorted(
+            (trace for trace in self._finished if trace["duration_ms"] >= min_duration_ms),
+            key=lambda trace: trace["duration_ms"],
+            reverse=True
+        )[:limit]
+        return [
+            {key: value for key, value in trace.items() if key != "spans"} | {"critical_path": critical_path(trace)}
+            for trace in traces
+        ]
+
+
+def critical_path(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Walk back from the end of each span through the children that finished last."""
+    spans = {span["span_id"]: span for span in trace["spans"]}
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for span in trace["spans"]:
+        children.setdefault(span["parent_id"], []).append(span)
+    
+    def span_end(span: Dict[str, Any]) -> float:
+        return span["start"] + span["duration_ms"] / 1000
+    
+    def walk(span: Dict[str, Any], depth: int) -> List[Dict[str, Any]]:
+        chain, cursor = [], span_end(span)
+        for child in sorted(children.get(span["span_id"], []), key=span_end, reverse=True):
+            if span_end(child) <= cursor + 1e-3:
+                chain.append(child)
+                cursor = child["start"]
+        
+        path = [{
+            "name": span["name"],
+            "kind": span["kind"],
+            "depth": depth,
+            "offset_ms": round((span["start"] - trace["started_at"]) * 1000, 2),
+            "duration_ms": span["duration_ms"],
+            "self_ms": round(span["duration_ms"] - sum(child["duration_ms"] for child in chain), 2),
+            "status": span["status"]
+        }]
+        for child in reversed(chain):
+            path.extend(walk(child, depth + 1))
+        return path
+    
+    root = spans.get(trace["root_span_id"])
+    return walk(root, 0) if root else []
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        settings = get_settings()
+        _tracer = Tracer(settings.tracing_enabled, settings.trace_buffer_size, settings.trace_export_path)
+    return _tracer
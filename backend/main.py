@@ -1,8 +1,9 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.api import router
-from backend.core import get_settings, get_logger
+from backend.api import router, RequestContextMiddleware
+from backend.core import get_settings, get_logger, get_loop_monitor
+from backend.services import agent_runner, analytics, model_client, speculator, traffic_capture
 
 settings = get_settings()
 logger = get_logger("main")
@@ -10,8 +11,19 @@ logger = get_logger("main")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info(f"Starting server on {settings.backend_host}:{settings.backend_port}")
+    logger.info("Starting server on %s:%s", settings.backend_host, settings.backend_port)
+    loop_monitor = get_loop_monitor()
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+    agent_runner.use_openai_client(model_client.start())
+    analytics.start()
     yield
+    await loop_monitor.stop()
+    await speculator.shutdown()
+    traffic_capture.flush()
+    analytics.stop()
+    agent_runner.use_openai_client(None)
+    await model_client.close()
     logger.info("Shutting down server")
 
 
@@ -27,7 +39,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(RequestContextMiddleware)
 
 app.include_router(router, prefix="/api/v1")
 
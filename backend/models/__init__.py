@@ -1,4 +1,4 @@
 from .session import Session, Conversation, Message
+from .reservation import ReservationSlots
 
-__all__ = ["Session", "Conversation", "Message"]
-
+__all__ = ["Session", "Conversation", "Message", "ReservationSlots"]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional
+
+SLOT_ORDER = ("date", "time", "party_size")
+
+
+class ReservationSlots(BaseModel):
+    active: bool = False
+    date: Optional[str] = None
+    time: Optional[str] = None
+    party_size: Optional[int] = None
+    
+    def missing_slot(self) -> Optional[str]:
+        return next((slot for slot in SLOT_ORDER if getattr(self, slot) is None), None)
+    
+    def is_complete(self) -> bool:
+        return self.missing_slot() is None
+    
+    def reset(self, active: bool = False):
+        self.active = active
+        self.date = None
+        self.time = None
+        self.party_size = None
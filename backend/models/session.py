@@ -1,7 +1,10 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+import json
+import sys
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Dict, Any, NamedTuple, Optional
 from datetime import datetime, timedelta
 from uuid import uuid4
+from backend.models.reservation import ReservationSlots
 
 
 class Message(BaseModel):
@@ -11,22 +14,129 @@ class Message(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class ConversationCheckpoint(NamedTuple):
+    messages: int
+    buffer_bytes: int
+    reservation: ReservationSlots
+    reservation_turns: int
+    pending_widget: Optional[str]
+    pending_widget_config: Optional[Dict[str, Any]]
+
+
 class Conversation(BaseModel):
     conversation_id: str = Field(default_factory=lambda: str(uuid4()))
     messages: List[Message] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     last_activity: datetime = Field(default_factory=datetime.now)
+    pending_widget: Optional[str] = None
+    pending_widget_config: Optional[Dict[str, Any]] = None
+    reservation_turns: int = 0
+    reservation: ReservationSlots = Field(default_factory=ReservationSlots)
+    _history_buffer: bytearray = PrivateAttr(default_factory=bytearray)
+    _response_id: Optional[str] = PrivateAttr(default=None)
+    _response_messages: int = PrivateAttr(default=0)
     
     def add_message(self, role: str, content: str, metadata: Dict[str, Any] = None):
         message = Message(role=role, content=content, metadata=metadata or {})
         self.messages.append(message)
+        self._append_encoded(message)
         self.updated_at = datetime.now()
         self.last_activity = datetime.now()
     
+    def _append_encoded(self, message: Message):
+        encoded = json.dumps(
+            {
+                "role": message.role,
+                "content": message.content,
+                "timestamp": message.timestamp.isoformat(),
+                "metadata": message.metadata
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str
+        ).encode("utf-8")
+        if self._history_buffer:
+            self._history_buffer += b","
+        self._history_buffer += encoded
+    
+    def checkpoint(self) -> ConversationCheckpoint:
+        """What a turn changes before the agent answers: messages, reservation slots and widget tracking."""
+        return ConversationCheckpoint(
+            len(self.messages),
+            len(self._history_buffer),
+            self.reservation.model_copy(),
+            self.reservation_turns,
+            self.pending_widget,
+            self.pending_widget_config
+        )
+    
+    def rollback(self, checkpoint: ConversationCheckpoint) -> bool:
+        """Undo an abandoned turn: its user message and the reservation state it changed.
+        
+        If other messages followed it, the message is kept and marked cancelled and the state is left alone,
+        since later turns built on it; returns whether the turn was undone.
+        """
+        messages = checkpoint.messages
+        if len(self.messages) <= messages:
+            return False
+        if len(self.messages) == messages + 1:
+            del self.messages[messages:]
+            del self._history_buffer[checkpoint.buffer_bytes:]
+            self._response_messages = min(self._response_messages, messages)
+            self.reservation = checkpoint.reservation
+            self.reservation_turns = checkpoint.reservation_turns
+            self.pending_widget = checkpoint.pending_widget
+            self.pending_widget_config = checkpoint.pending_widget_config
+            return True
+        
+        self.messages[messages].metadata["cancelled"] = True
+        self._history_buffer = bytearray()
+        for message in self.messages:
+            self._append_encoded(message)
+        return False
+    
+    def history_json(self) -> bytes:
+        """Serialized history response built from the append-only buffer, without re-encoding messages."""
+        return b"".join((
+            b'{"conversation_id":', json.dumps(self.conversation_id).encode("utf-8"),
+            b',"messages":[', self._history_buffer, b"]}"
+        ))
+    
+    @property
+    def response_id(self) -> Optional[str]:
+        """Model response whose server-held state already covers the conversation up to the last run."""
+        return self._response_id
+    
+    def pending_input(self) -> List[Dict[str, str]]:
+        """Messages the model has not seen yet: everything after the saved response, or the whole transcript."""
+        start = self._response_messages if self._response_id else 0
+        return [{"role": msg.role, "content": msg.content} for msg in self.messages[start:]]
+    
+    def save_response(self, response_id: Optional[str]):
+        self._response_id = response_id
+        self._response_messages = len(self.messages)
+    
     def is_inactive(self, minutes: int = 30) -> bool:
         """Check if conversation has been inactive for specified minutes."""
         return datetime.now() - self.last_activity > timedelta(minutes=minutes)
+    
+    def memory_footprint(self) -> Dict[str, int]:
+        """Estimate the heap held by this conversation: message objects, contents, metadata and history buffer."""
+        content_bytes = sum(len(msg.content.encode("utf-8")) for msg in self.messages)
+        metadata_bytes = sum(len(json.dumps(msg.metadata, default=str)) for msg in self.messages if msg.metadata)
+        object_bytes = sum(
+            sys.getsizeof(msg) + sys.getsizeof(msg.__dict__) + sys.getsizeof(msg.content) + sys.getsizeof(msg.metadata)
+            for msg in self.messages
+        )
+        buffer_bytes = len(self._history_buffer)
+        return {
+            "messages": len(self.messages),
+            "content_bytes": content_bytes,
+            "metadata_bytes": metadata_bytes,
+            "history_buffer_bytes": buffer_bytes,
+            "estimated_bytes": object_bytes + metadata_bytes + buffer_bytes
+        }
 
 
 class Session(BaseModel):
@@ -1,4 +1,23 @@
 from .session_manager import session_manager
+from .reservation_flow import reservation_flow
+from .usage_tracker import usage_tracker
+from .model_client import model_client
+from .cassette import model_cassette
+from .agent_runner import agent_runner
+from .idempotency import idempotency_cache
+from .traffic_capture import traffic_capture
+from .speculation import speculator
+from .analytics import analytics
 
-__all__ = ["session_manager"]
-
+__all__ = [
+    "session_manager",
+    "reservation_flow",
+    "usage_tracker",
+    "model_client",
+    "model_cassette",
+    "agent_runner",
+    "idempotency_cache",
+    "traffic_capture",
+    "speculator",
+    "analytics"
+]
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from agents import Agent, ModelProvider, ModelSettings, Runner, RunConfig, RunResult
+from agents.models.multi_provider import MultiProvider
+from openai import AsyncOpenAI
+from backend.core import get_logger, get_metrics, get_settings
+from backend.core.tracing import Span, get_tracer
+from backend.services.analytics import AnalyticsHooks
+from backend.services.cassette import model_cassette
+from backend.services.resilience import CircuitOpenError, circuit_breaker, is_upstream_failure
+from backend.services.trace_hooks import HookGroup, TraceHooks
+from backend.services.usage_tracker import UsageHooks, usage_tracker
+
+logger = get_logger("agent_runner")
+metrics = get_metrics()
+settings = get_settings()
+tracer = get_tracer()
+
+
+class AgentRunner:
+    """Single entry point for agent runs so every turn is accounted for the same way."""
+    
+    def __init__(self):
+        self.use_openai_client(None)
+    
+    def use_openai_client(self, client: Optional[AsyncOpenAI]):
+        """Route every agent's model calls through the given client (None lets the SDK create its own).
+        
+        With MODEL_CASSETTE_MODE set, calls are also recorded to or replayed from the cassette.
+        """
+        self.use_model_provider(model_cassette.wrap(MultiProvider(openai_client=client)))
+    
+    def use_model_provider(self, provider: ModelProvider):
+        # A shared cache key keeps requests with identical instruction/tool prefixes on the same cache shard.
+        model_settings = ModelSettings(extra_args={"prompt_cache_key": settings.prompt_cache_key})
+        self._run_config = RunConfig(model_provider=provider, model_settings=model_settings)
+        self._hedge_config = RunConfig(model=settings.fallback_model, model_provider=provider, model_settings=model_settings)
+    
+    async def run(
+        self,
+        agent: Agent,
+        input: List[Dict[str, Any]],
+        session_id: str,
+        conversation_id: str,
+        deadline: Optional[float] = None,
+        context: Any = None,
+        previous_response_id: Optional[str] = None
+    ) -> Tuple[RunResult, Dict[str, Any]]:
+        """Run the agent within the request deadline (monotonic time); raises TimeoutError or CircuitOpenError.
+        
+        The context is handed to the SDK run context, where handoff input filters can read it.
+        """
+        if not circuit_breaker.allow():
+            metrics.increment("resilience.breaker_rejections")
+            raise CircuitOpenError("Model circuit breaker is open")
+        
+        deadline = deadline or time.monotonic() + settings.chat_deadline_seconds
+        hooks = UsageHooks()
+        event_hooks = AnalyticsHooks(session_id, conversation_id)
+        started = time.monotonic()
+        try:
+            with tracer.span(f"run {agent.name}", kind="agent_run", conversation_id=conversation_id) as span:
+                result = await self._run_hedged(agent, input, context, previous_response_id, hooks, event_hooks, deadline, span)
+        except asyncio.TimeoutError:
+            metrics.increment("resilience.timeouts")
+            circuit_breaker.record_failure()
+            self._record_failed(session_id, conversation_id, hooks)
+            raise
+        except asyncio.CancelledError:
+            circuit_breaker.release_probe()
+            self._record_cancelled(session_id, conversation_id, hooks)
+            raise
+        except Exception as e:
+            # Requests the API rejected (e.g. an expired previous_response_id) say nothing about its health
+            if is_upstream_failure(e):
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.release_probe()
+            self._record_failed(session_id, conversation_id, hooks)
+            raise
+        
+        circuit_breaker.record_success(time.monotonic() - started)
+        usage = usage_tracker.record(session_id, conversation_id, hooks)
+        metrics.increment("runs.completed")
+        metrics.increment("runs.completed_tokens", usage["input_tokens"] + usage["output_tokens"])
+        return result, usage
+    
+    @staticmethod
+    def _record_failed(session_id: str, conversation_id: str, hooks: UsageHooks):
+        """Model calls a failed or timed-out run (and its hedge) already made are still paid for."""
+        usage_tracker.record(session_id, conversation_id, hooks)
+        metrics.increment("runs.failed")
+    
+    @staticmethod
+    def _record_cancelled(session_id: str, conversation_id: str, hooks: UsageHooks):
+        """Charge what an abandoned run already spent and estimate what its remaining steps would have cost."""
+        spent = usage_tracker.record(session_id, conversation_id, hooks)
+        spent_tokens = spent["input_tokens"] + spent["output_tokens"]
+        # Estimated from the mean completed run, so a run cancelled late saves little
+        saved = max(metrics.ratio("runs.completed_tokens", "runs.completed") - spent_tokens, 0)
+        metrics.increment("runs.cancelled")
+        metrics.increment("runs.cancelled_tokens_spent", spent_tokens)
+        metrics.increment("runs.tokens_saved", saved)
+        logger.info("Cancelled run for %s after %s tokens, ~%.0f tokens saved", conversation_id, spent_tokens, saved)
+    
+    async def _run_hedged(
+        self,
+        agent: Agent,
+        input: List[Dict[str, Any]],
+        context: Any,
+        previous_response_id: Optional[str],
+        hooks: UsageHooks,
+        event_hooks: AnalyticsHooks,
+        deadline: float,
+        span: Optional[Span]
+    ) -> RunResult:
+        trace_hooks = [TraceHooks(span)]
+        hedge_hooks: Optional[UsageHooks] = None
+        primary = asyncio.create_task(
+            Runner.run(
+                agent,
+                input=input,
+                context=context,
+                previous_response_id=previous_response_id,
+                hooks=HookGroup(hooks, trace_hooks[0], event_hooks),
+                run_config=self._run_config
+            )
+        )
+        tasks = {primary}
+        try:
+            if settings.hedge_enabled:
+                done, _ = await asyncio.wait(tasks, timeout=min(settings.hedge_after_seconds, self._remaining(deadline)))
+                if not done:
+                    logger.warning("Hedging %s with fallback model %s", agent.name, settings.fallback_model)
+                    metrics.increment("resilience.hedges")
+                    hedge_hooks = UsageHooks(model_override=settings.fallback_model)
+                    trace_hooks.append(TraceHooks(span, label=" (hedge)"))
+                    hedge = asyncio.create_task(Runner.run(
+                        agent,
+                        input=input,
+                        context=context,
+                        previous_response_id=previous_response_id,
+                        hooks=HookGroup(hedge_hooks, trace_hooks[-1], event_hooks),
+                        run_config=self._hedge_config
+                    ))
+                    tasks.add(hedge)
+            
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, timeout=self._remaining(deadline), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError(f"Agent run exceeded deadline of {settings.chat_deadline_seconds}s")
+                succeeded = [task for task in done if not task.cancelled() and not task.exception()]
+                if succeeded:
+                    if primary not in succeeded:
+                        metrics.increment("resilience.hedge_wins")
+                    return succeeded[0].result()
+                if not tasks:
+                    # Re-raises the failure, or CancelledError if the task was cancelled from outside
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Merged here rather than on hedge completion, so run() charges the hedge before recording usage
+            if hedge_hooks:
+                hooks.merge(hedge_hooks, suffix=" (hedge)")
+            for hooks_for_task in trace_hooks:
+                hooks_for_task.close()
+    
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(deadline - time.monotonic(), 0)
+
+
+agent_runner = AgentRunner()
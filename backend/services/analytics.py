@@ -0,0 +1,207 @@
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from agents import RunHooks
+from backend.core import get_logger, get_metrics, get_request_id, get_settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = get_logger("analytics")
+metrics = get_metrics()
+settings = get_settings()
+
+
+def event_schema() -> "pa.Schema":
+    return pa.schema([
+        ("ts", pa.timestamp("ms", tz="UTC")),
+        ("event", pa.string()),
+        ("session_id", pa.string()),
+        ("conversation_id", pa.string()),
+        ("request_id", pa.string()),
+        ("agent", pa.string()),
+        ("action", pa.string()),
+        ("tool", pa.string()),
+        ("status", pa.string()),
+        ("latency_ms", pa.float64()),
+        # Event-specific extras as JSON, so the columnar schema stays fixed
+        ("detail", pa.string())
+    ])
+
+
+@dataclass
+class OpenFile:
+    writer: "pq.ParquetWriter"
+    temp_path: Path
+    final_path: Path
+    opened_at: float
+    rows: int = 0
+
+
+class AnalyticsExporter:
+    """Conversation events go onto a bounded in-process queue; a writer thread batches them into Parquet.
+    
+    Files are partitioned by day (date=YYYY-MM-DD), written under a dot-prefixed name that dataset
+    scanners ignore, and renamed into place when they roll over by size or age.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool,
+        path: str,
+        queue_size: int,
+        batch_rows: int,
+        flush_seconds: float,
+        max_file_bytes: int,
+        rollover_seconds: float
+    ):
+        if enabled and pa is None:
+            logger.warning("ANALYTICS_ENABLED is set but pyarrow is not installed, analytics export disabled")
+        self.enabled = enabled and pa is not None
+        self.path = Path(path)
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.max_file_bytes = max_file_bytes
+        self.rollover_seconds = rollover_seconds
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._files: Dict[str, OpenFile] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._sequence = 0
+    
+    def emit(self, event: str, session_id: Optional[str] = None, conversation_id: Optional[str] = None, **fields):
+        """Queue one event without blocking; events are dropped and counted if the writer falls behind."""
+        if not self.enabled:
+            return
+        detail = fields.pop("detail", None)
+        row = {
+            "ts": datetime.now(timezone.utc),
+            "event": event,
+            "session_id": session_id,
+            "conversation_id": conversation_id,
+            "request_id": get_request_id(),
+            **fields,
+            "detail": json.dumps(detail, ensure_ascii=False, default=str) if detail else None
+        }
+        try:
+            self._queue.put_nowait(row)
+            metrics.increment("analytics.events")
+        except queue.Full:
+            metrics.increment("analytics.dropped")
+    
+    def start(self):
+        if not self.enabled or self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+        self._thread.start()
+        logger.info("Analytics export to %s started", self.path)
+    
+    def stop(self, timeout: float = 10.0):
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _run(self):
+        batch: List[Dict[str, Any]] = []
+        last_flush = time.monotonic()
+        while True:
+            try:
+                row = self._queue.get(timeout=max(self.flush_seconds - (time.monotonic() - last_flush), 0.01))
+            except queue.Empty:
+                row = False
+            if row is None:
+                break
+            if row:
+                batch.append(row)
+            if len(batch) >= self.batch_rows or time.monotonic() - last_flush >= self.flush_seconds:
+                self._write(batch)
+                batch = []
+                last_flush = time.monotonic()
+        
+        self._write(batch)
+        for partition in list(self._files):
+            self._close(partition)
+    
+    def _write(self, rows: List[Dict[str, Any]]):
+        try:
+            by_partition: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_partition.setdefault(row["ts"].strftime("%Y-%m-%d"), []).append(row)
+            for partition, partition_rows in by_partition.items():
+                open_file = self._files.get(partition) or self._open(partition)
+                open_file.writer.write_table(pa.Table.from_pylist(partition_rows, schema=open_file.writer.schema))
+                open_file.rows += len(partition_rows)
+                metrics.increment("analytics.rows_written", len(partition_rows))
+            
+            now, today = time.monotonic(), datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            for partition, open_file in list(self._files.items()):
+                too_big = open_file.temp_path.stat().st_size >= self.max_file_bytes
+                if too_big or now - open_file.opened_at >= self.rollover_seconds or partition < today:
+                    self._close(partition)
+        except Exception as e:
+            metrics.increment("analytics.dropped", len(rows))
+            logger.error("Dropping %s analytics events, Parquet write failed: %s", len(rows), e)
+    
+    def _open(self, partition: str) -> OpenFile:
+        directory = self.path / f"date={partition}"
+        directory.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        name = f"events-{datetime.now(timezone.utc):%H%M%S}-{os.getpid()}-{self._sequence:05d}.parquet"
+        temp_path = directory / f".{name}"
+        open_file = OpenFile(pq.ParquetWriter(temp_path, event_schema()), temp_path, directory / name, time.monotonic())
+        self._files[partition] = open_file
+        return open_file
+    
+    def _close(self, partition: str):
+        open_file = self._files.pop(partition)
+        open_file.writer.close()
+        open_file.temp_path.rename(open_file.final_path)
+        metrics.increment("analytics.files")
+        logger.debug("Rolled over %s (%s rows)", open_file.final_path, open_file.rows)
+
+
+class AnalyticsHooks(RunHooks):
+    """Emits handoff and tool call events for one agent run."""
+    
+    def __init__(self, session_id: str, conversation_id: str):
+        self.session_id = session_id
+        self.conversation_id = conversation_id
+        self._tool_started: Dict[str, float] = {}
+    
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        analytics.emit("handoff", self.session_id, self.conversation_id, agent=to_agent.name, detail={"from": from_agent.name})
+    
+    async def on_tool_start(self, context, agent, tool) -> None:
+        self._tool_started[getattr(context, "tool_call_id", None) or tool.name] = time.perf_counter()
+    
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        started = self._tool_started.pop(getattr(context, "tool_call_id", None) or tool.name, None)
+        analytics.emit(
+            "tool_call",
+            self.session_id,
+            self.conversation_id,
+            agent=agent.name,
+            tool=tool.name,
+            latency_ms=(time.perf_counter() - started) * 1000 if started else None
+        )
+
+
+analytics = AnalyticsExporter(
+    enabled=settings.analytics_enabled,
+    path=settings.analytics_path,
+    queue_size=settings.analytics_queue_size,
+    batch_rows=settings.analytics_batch_rows,
+    flush_seconds=settings.analytics_flush_seconds,
+    max_file_bytes=settings.analytics_max_file_mb * 1024 * 1024,
+    rollover_seconds=settings.analytics_rollover_seconds
+)
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from pydantic import TypeAdapter
+from openai.types.responses import ResponseOutputItem
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+from agents import Model, ModelProvider, ModelResponse, Usage
+from backend.core import get_logger, get_metrics, get_settings
+
+logger = get_logger("cassette")
+metrics = get_metrics()
+settings = get_settings()
+
+output_items = TypeAdapter(List[ResponseOutputItem])
+
+
+class CassetteMissError(LookupError):
+    pass
+
+
+def _canonical(value: Any) -> str:
+    default = lambda obj: obj.model_dump(exclude_unset=True) if hasattr(obj, "model_dump") else str(obj)
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(_canonical(value).encode("utf-8")).hexdigest()
+
+
+def _items(input) -> List[Dict[str, Any]]:
+    items = [{"role": "user", "content": input}] if isinstance(input, str) else input
+    return [item.model_dump(exclude_unset=True) if hasattr(item, "model_dump") else item for item in items]
+
+
+def request_keys(
+    model: str,
+    system_instructions: Optional[str],
+    model_settings,
+    tools,
+    output_schema,
+    handoffs,
+    input,
+    previous_response_id: Optional[str]
+) -> Dict[str, str]:
+    """Exact key over everything that shapes the reply, plus a loose key for replay fallback.
+    
+    The exact key includes the previous response id: replayed responses carry their recorded ids, so in
+    session run-state mode each chained call stays tied to its own conversation and position. The loose key
+    keeps only the customer's words and the item sequence, so a replay still matches when volatile content
+    differs (time-of-day greeting, generated ids in tool outputs).
+    """
+    tool_specs = [
+        {"name": tool.name, "parameters": getattr(tool, "params_json_schema", None)} for tool in tools
+    ] + [
+        {"name": handoff.tool_name, "parameters": handoff.input_json_schema} for handoff in handoffs
+    ]
+    items = _items(input)
+    shape = [
+        item.get("content") if item.get("role") == "user" else item.get("role") or item.get("type")
+        for item in items
+    ]
+    schema = output_schema.json_schema() if output_schema and not output_schema.is_plain_text() else None
+    return {
+        "key": _digest([
+            model, system_instructions, model_settings.to_json_dict(), tool_specs, schema, items, previous_response_id
+        ]),
+        "loose_key": _digest([
+            model, system_instructions, [spec["name"] for spec in tool_specs], shape, previous_response_id is not None
+        ])
+    }
+
+
+def dump_response(response: ModelResponse) -> Dict[str, Any]:
+    usage = response.usage
+    return {
+        "output": [item.model_dump(exclude_unset=True) for item in response.output],
+        "usage": {
+            "requests": usage.requests,
+            "input_tokens": usage.input_tokens,
+            "cached_tokens": usage.input_tokens_details.cached_tokens,
+            "output_tokens": usage.output_tokens,
+            "reasoning_tokens": usage.output_tokens_details.reasoning_tokens,
+            "total_tokens": usage.total_tokens
+        },
+        "response_id": response.response_id
+    }
+
+
+def load_response(data: Dict[str, Any]) -> ModelResponse:
+    usage = data["usage"]
+    return ModelResponse(
+        output=output_items.validate_python(data["output"]),
+        usage=Usage(
+            requests=usage["requests"],
+            input_tokens=usage["input_tokens"],
+            input_tokens_details=InputTokensDetails(cached_tokens=usage["cached_tokens"]),
+            output_tokens=usage["output_tokens"],
+            output_tokens_details=OutputTokensDetails(reasoning_tokens=usage["reasoning_tokens"]),
+            total_tokens=usage["total_tokens"]
+        ),
+        response_id=data["response_id"]
+    )
+
+
+class Cassette:
+    """Model calls recorded to, or replayed from, a JSONL file (one call per line).
+    
+    Repeated identical requests replay their recordings in order; once those run out the last one repeats.
+    """
+    
+    def __init__(self, mode: str, path: str, latency: str):
+        self.mode = mode
+        self.path = Path(path)
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, List[Dict[str, Any]]]] = {"key": defaultdict(list), "loose_key": defaultdict(list)}
+        self._served: Dict[str, int] = defaultdict(int)
+        self._loaded = False
+    
+    def wrap(self, provider: ModelProvider) -> ModelProvider:
+        if self.mode == "off":
+            return provider
+        if self.mode == "replay":
+            self._load()
+        logger.info("Model cassette %s: %s (latency=%s)", self.mode, self.path, self.latency)
+        return CassetteProvider(provider, self)
+    
+    def _load(self):
+        if self._loaded:
+            return
+        if not self.path.exists():
+            raise FileNotFoundError(f"Model cassette {self.path} does not exist; record it with MODEL_CASSETTE_MODE=record")
+        loaded = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries["key"][entry["key"]].append(entry)
+                    self._entries["loose_key"][entry["loose_key"]].append(entry)
+                    loaded += 1
+        self._loaded = True
+        logger.info("Loaded %s recorded model calls from %s", loaded, self.path)
+    
+    async def record(self, keys: Dict[str, str], model: str, response: ModelResponse, latency_ms: float):
+        entry = {**keys, "model": model, "latency_ms": round(latency_ms, 1), "response": dump_response(response)}
+        await asyncio.to_thread(self._append, json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        metrics.increment("cassette.recorded")
+    
+    def _append(self, line: str):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+    
+    async def replay(self, keys: Dict[str, str], model: str) -> ModelResponse:
+        for kind in ("key", "loose_key"):
+            entries = self._entries[kind].get(keys[kind])
+            if entries:
+                break
+        else:
+            metrics.increment("cassette.misses")
+            raise CassetteMissError(f"No recorded {model} call matches request {keys['key'][:12]} in {self.path}")
+        
+        served = self._served[keys[kind]]
+        self._served[keys[kind]] += 1
+        entry = entries[min(served, len(entries) - 1)]
+        metrics.increment("cassette.hits" if kind == "key" else "cassette.loose_hits")
+        if self.latency == "original":
+            await asyncio.sleep(entry["latency_ms"] / 1000)
+        return load_response(entry["response"])
+
+
+class CassetteModel(Model):
+    def __init__(self, model: Model, model_name: str, cassette: Cassette):
+        self.model = model
+        self.model_name = model_name
+        self.cassette = cassette
+    
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *,
+                           previous_response_id=None, conversation_id=None, prompt=None) -> ModelResponse:
+        keys = request_keys(
+            self.model_name, system_instructions, model_settings, tools, output_schema, handoffs, input, previous_response_id
+        )
+        if self.cassette.mode == "replay":
+            return await self.cassette.replay(keys, self.model_name)
+        
+        started = time.perf_counter()
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt
+        )
+        await self.cassette.record(keys, self.model_name, response, (time.perf_counter() - started) * 1000)
+        return response
+    
+    def stream_response(self, *args, **kwargs):
+        # Agent runs are not streamed; recording passes streams through untouched
+        if self.cassette.mode == "replay":
+            raise CassetteMissError(f"Streamed {self.model_name} calls are never recorded, so none can replay from {self.cassette.path}")
+        return self.model.stream_response(*args, **kwargs)
+
+
+class CassetteProvider(ModelProvider):
+    def __init__(self, provider: ModelProvider, cassette: Cassette):
+        self.provider = provider
+        self.cassette = cassette
+    
+    def get_model(self, model_name: Optional[str]) -> Model:
+        # Replay never touches the wrapped provider, so it runs offline without a real API key
+        model = None if self.cassette.mode == "replay" else self.provider.get_model(model_name)
+        return CassetteModel(model, model_name or settings.openai_model, self.cassette)
+
+
+model_cassette = Cassette(settings.model_cassette_mode, settings.model_cassette_path, settings.model_cassette_latency)
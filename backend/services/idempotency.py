@@ -0,0 +1,71 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Tuple
+from backend.core import get_logger, get_metrics, get_settings
+
+logger = get_logger("idempotency")
+metrics = get_metrics()
+settings = get_settings()
+
+
+class _Abandoned(Exception):
+    """The request producing a shared response was cancelled; its duplicates should produce it themselves."""
+
+
+class IdempotencyCache:
+    """Bounded TTL cache of serialized responses; concurrent duplicates share the in-flight result."""
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, asyncio.Future]]" = OrderedDict()
+    
+    async def run(self, scope: str, key: str, producer: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, bool]:
+        """Return (body, replayed). The producer only runs for the first request carrying a key."""
+        self._evict()
+        cache_key = (scope, key)
+        entry = self._entries.get(cache_key)
+        
+        if entry:
+            metrics.increment("idempotency.replays")
+            logger.info("Replaying idempotent response for %s/%s (in flight: %s)", scope, key, not entry[1].done())
+            try:
+                return await asyncio.shield(entry[1]), True
+            except _Abandoned:
+                return await self.run(scope, key, producer)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._entries[cache_key] = (time.monotonic() + self.ttl_seconds, future)
+        try:
+            body = await producer()
+        except asyncio.CancelledError:
+            self._entries.pop(cache_key, None)
+            # Never cancel a future other requests await: they did not go away, so wake them to retry
+            future.set_exception(_Abandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            self._entries.pop(cache_key, None)
+            future.set_exception(e)
+            # Mark retrieved so a key without duplicates does not log "exception never retrieved".
+            future.exception()
+            raise
+        future.set_result(body)
+        return body, False
+    
+    def _evict(self):
+        now = time.monotonic()
+        overflow = len(self._entries) - self.max_entries + 1
+        for cache_key, (expires_at, future) in list(self._entries.items()):
+            if expires_at > now and overflow <= 0:
+                break
+            if future.done():
+                del self._entries[cache_key]
+                overflow -= 1
+
+
+idempotency_cache = IdempotencyCache(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    max_entries=settings.idempotency_max_entries
+)
@@ -0,0 +1,101 @@
+import time
+from typing import Any, Dict, Optional
+import httpx
+from openai import AsyncOpenAI
+from agents import set_default_openai_client
+from backend.core import get_logger, get_metrics, get_settings
+
+try:
+    import h2  # noqa: F401
+except ImportError:
+    h2 = None
+
+logger = get_logger("model_client")
+metrics = get_metrics()
+settings = get_settings()
+
+CONNECT_STEPS = {"connection.connect_tcp": "connections_opened", "connection.start_tls": "tls_handshakes"}
+
+
+class ModelClient:
+    """One pooled AsyncOpenAI client for the whole process, so model calls reuse warm TLS connections."""
+    
+    def __init__(self):
+        self.client: Optional[AsyncOpenAI] = None
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def start(self) -> AsyncOpenAI:
+        if self.client:
+            return self.client
+        http2 = settings.openai_http2 and h2 is not None
+        if settings.openai_http2 and not http2:
+            logger.warning("OPENAI_HTTP2 is set but the h2 package is not installed, using HTTP/1.1")
+        
+        self._http = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry=settings.openai_keepalive_expiry_seconds
+            ),
+            timeout=httpx.Timeout(settings.openai_read_timeout_seconds, connect=settings.openai_connect_timeout_seconds),
+            event_hooks={"request": [self._attach_trace]}
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            max_retries=settings.openai_max_retries,
+            http_client=self._http
+        )
+        set_default_openai_client(self.client, use_for_tracing=False)
+        logger.info(
+            "OpenAI client ready: base_url=%s max_connections=%s keepalive=%s http2=%s",
+            self.client.base_url, settings.openai_max_connections, settings.openai_max_keepalive_connections, http2
+        )
+        return self.client
+    
+    async def close(self):
+        if self._http:
+            await self._http.aclose()
+        self.client = None
+        self._http = None
+    
+    @staticmethod
+    async def _attach_trace(request: httpx.Request):
+        started: Dict[str, float] = {}
+        
+        async def trace(event: str, info: Dict[str, Any]):
+            # httpcore emits these only when it opens a new connection, never for a reused one
+            step, _, phase = event.rpartition(".")
+            if step not in CONNECT_STEPS:
+                return
+            if phase == "started":
+                started[step] = time.perf_counter()
+                return
+            if phase == "complete":
+                metrics.increment(f"openai.{CONNECT_STEPS[step]}")
+            metrics.increment("openai.connect_ms", (time.perf_counter() - started.pop(step, time.perf_counter())) * 1000)
+        
+        request.extensions["trace"] = trace
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        if not self._http:
+            return {"started": False}
+        # httpx keeps its connection pool on the (private) transport; degrade gracefully if that changes
+        pool = getattr(self._http._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "started": True,
+            "base_url": str(self.client.base_url),
+            "max_connections": settings.openai_max_connections,
+            "max_keepalive_connections": settings.openai_max_keepalive_connections,
+            "connections": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+            "active": sum(1 for connection in connections if not connection.is_idle() and not connection.is_closed()),
+            "in_flight_requests": len(getattr(pool, "_requests", ())),
+            "connections_opened": metrics.get("openai.connections_opened"),
+            "tls_handshakes": metrics.get("openai.tls_handshakes")
+        }
+
+
+model_client = ModelClient()
@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from backend.agents.widget_manager import widget_manager
+from backend.core import get_logger, redact
+from backend.models import Conversation, ReservationSlots
+
+logger = get_logger("reservation_flow")
+
+SLOT_ACTIONS = {
+    "select_date": "date",
+    "select_time": "time",
+    "select_party_size": "party_size"
+}
+
+SLOT_PROMPTS = {
+    "date": "What date would you like to book?",
+    "time": "What time would you prefer?",
+    "party_size": "How many guests will be dining?"
+}
+
+
+@dataclass
+class FlowStep:
+    reply: Optional[str] = None
+    widgets: List[Dict[str, Any]] = field(default_factory=list)
+    agent_input: Optional[str] = None
+
+
+def _validate_date(value: Any, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        selected = datetime.strptime(str(value), "%Y-%m-%d").date()
+    except ValueError:
+        return None, "That doesn't look like a valid date."
+    if not date.today() <= selected <= date.today() + timedelta(days=config["max_days_ahead"]):
+        return None, f"Please pick a date within the next {config['max_days_ahead']} days."
+    return selected.isoformat(), None
+
+
+def _validate_time(value: Any, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        selected = datetime.strptime(str(value), "%H:%M").strftime("%H:%M")
+    except ValueError:
+        return None, "That doesn't look like a valid time."
+    if not config["start_time"] <= selected <= config["end_time"]:
+        return None, f"We take reservations between {config['start_time']} and {config['end_time']}."
+    return selected, None
+
+
+def _validate_party_size(value: Any, config: Dict[str, Any]) -> Tuple[Optional[int], Optional[str]]:
+    try:
+        selected = int(value)
+    except (TypeError, ValueError):
+        return None, "Please choose the number of guests."
+    if not config["min_value"] <= selected <= config["max_value"]:
+        return None, f"We can seat between {config['min_value']} and {config['max_value']} guests."
+    return selected, None
+
+
+SLOT_VALIDATORS: Dict[str, Callable[[Any, Dict[str, Any]], Tuple[Any, Optional[str]]]] = {
+    "date": _validate_date,
+    "time": _validate_time,
+    "party_size": _validate_party_size
+}
+
+
+class ReservationFlow:
+    """Server-side slot filling: widgets fill slots, the agent only runs once all slots are known."""
+    
+    def handle(self, conversation: Conversation, action: Optional[str], widget_data: Optional[Dict[str, Any]]) -> Optional[FlowStep]:
+        slots = conversation.reservation
+        
+        if action == "make_reservation":
+            slots.reset(active=True)
+            logger.info("Reservation flow started for conversation %s", conversation.conversation_id)
+            return self._prompt_next(slots)
+        
+        slot = SLOT_ACTIONS.get((widget_data or {}).get("action"))
+        if not slot:
+            if slots.active and (action or conversation.pending_widget is None):
+                # Another quick action, or free text with no booking widget showing: the customer left the flow
+                slots.active = False
+                conversation.pending_widget = None
+                conversation.pending_widget_config = None
+                logger.info("Reservation flow abandoned for conversation %s", conversation.conversation_id)
+            return None
+        
+        slots.active = True
+        # Validate against the widget the customer was shown, which may carry request_widget overrides
+        shown = conversation.pending_widget_config if conversation.pending_widget == widget_data["action"] else None
+        widgets = widget_manager.create_reservation_widgets(slot, shown)
+        value, error = SLOT_VALIDATORS[slot](widget_data.get("value"), widgets[0]["widget_config"])
+        if error:
+            logger.info("Rejected %s value %r: %s", slot, redact(widget_data.get('value')), error)
+            return FlowStep(reply=f"{error} {SLOT_PROMPTS[slot]}", widgets=widgets)
+        
+        setattr(slots, slot, value)
+        if slots.is_complete():
+            logger.info("Reservation slots complete for conversation %s", conversation.conversation_id)
+            return FlowStep(agent_input=self.booking_request(slots))
+        return self._prompt_next(slots, acknowledged=slot)
+    
+    def complete(self, conversation: Conversation):
+        conversation.reservation.reset()
+    
+    @staticmethod
+    def booking_request(slots: ReservationSlots) -> str:
+        return (
+            f"I'd like to book a table on {slots.date} at {slots.time} for {slots.party_size} guests. "
+            "Please check availability and confirm."
+        )
+    
+    @staticmethod
+    def _prompt_next(slots: ReservationSlots, acknowledged: Optional[str] = None) -> FlowStep:
+        step = slots.missing_slot()
+        reply = SLOT_PROMPTS[step]
+        if acknowledged:
+            reply = f"Got it, {getattr(slots, acknowledged)}. {reply}"
+        return FlowStep(reply=reply, widgets=widget_manager.create_reservation_widgets(step))
+
+
+reservation_flow = ReservationFlow()
@@ -0,0 +1,79 @@
+import time
+import openai
+from backend.core import get_logger, get_metrics, get_settings
+
+logger = get_logger("resilience")
+metrics = get_metrics()
+settings = get_settings()
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Errors that say the model service is unhealthy, as opposed to a request it rejected (4xx)."""
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+class CircuitBreaker:
+    """Opens after consecutive failed or slow model calls, then lets one probe through after a cool-down."""
+    
+    def __init__(self, failure_threshold: int, latency_threshold_seconds: float, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold_seconds = latency_threshold_seconds
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float = 0.0
+        self._probe_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        if self._failures < self.failure_threshold:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+    
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+    
+    def record_success(self, latency_seconds: float):
+        self._probe_in_flight = False
+        if latency_seconds > self.latency_threshold_seconds:
+            logger.warning("Slow model call counted as failure: %.2fs", latency_seconds)
+            self.record_failure()
+            return
+        if self._failures >= self.failure_threshold:
+            logger.info("Circuit breaker closed")
+        self._failures = 0
+        metrics.set("breaker.open", 0)
+    
+    def release_probe(self):
+        """Free the half-open probe slot when a call ends without an outcome (e.g. cancelled)."""
+        self._probe_in_flight = False
+    
+    def record_failure(self):
+        self._probe_in_flight = False
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            if self._failures == self.failure_threshold:
+                logger.error("Circuit breaker opened after %s failures", self._failures)
+                metrics.increment("breaker.trips")
+            self._opened_at = time.monotonic()
+            metrics.set("breaker.open", 1)
+
+
+circuit_breaker = CircuitBreaker(
+    failure_threshold=settings.breaker_failure_threshold,
+    latency_threshold_seconds=settings.breaker_latency_threshold_seconds,
+    reset_seconds=settings.breaker_reset_seconds
+)
@@ -1,9 +1,13 @@
-from typing import Dict, Optional
+import heapq
+from typing import Any, Dict, List, Optional
 from backend.models import Session, Conversation
 from backend.core import get_logger
+from backend.services.usage_tracker import usage_tracker
 
 logger = get_logger("session_manager")
 
+FOOTPRINT_KEYS = ("messages", "content_bytes", "metadata_bytes", "history_buffer_bytes", "estimated_bytes")
+
 
 class SessionManager:
     def __init__(self):
@@ -13,13 +17,13 @@ class SessionManager:
     def create_session(self) -> str:
         session = Session()
         self._sessions[session.session_id] = session
-        logger.info(f"Created session: {session.session_id}")
+        logger.info("Created session: %s", session.session_id)
         return session.session_id
     
     def get_session(self, session_id: str) -> Optional[Session]:
         session = self._sessions.get(session_id)
         if not session:
-            logger.warning(f"Session not found: {session_id}")
+            logger.warning("Session not found: %s", session_id)
         return session
     
     def create_conversation(self, session_id: str) -> Optional[str]:
@@ -28,7 +32,7 @@ class SessionManager:
             return None
         
         conversation_id = session.create_conversation()
-        logger.info(f"Created conversation {conversation_id} in session {session_id}")
+        logger.info("Created conversation %s in session %s", conversation_id, session_id)
         return conversation_id
     
     def get_conversation(self, session_id: str, conversation_id: str) -> Optional[Conversation]:
@@ -38,15 +42,42 @@ class SessionManager:
         
         conversation = session.get_conversation(conversation_id)
         if not conversation:
-            logger.warning(f"Conversation {conversation_id} not found in session {session_id}")
+            logger.warning("Conversation %s not found in session %s", conversation_id, session_id)
         return conversation
     
+    def memory_report(self, top_conversations: int = 10, max_sessions: int = 50) -> Dict[str, Any]:
+        """Estimated memory per session, largest first, plus the largest conversations overall."""
+        totals = dict.fromkeys(("sessions", "conversations", *FOOTPRINT_KEYS), 0)
+        sessions: List[Dict[str, Any]] = []
+        conversations: List[Dict[str, Any]] = []
+        
+        for session_id, session in list(self._sessions.items()):
+            session_totals = {"session_id": session_id, "conversations": len(session.conversations), **dict.fromkeys(FOOTPRINT_KEYS, 0)}
+            for conversation_id, conversation in list(session.conversations.items()):
+                footprint = conversation.memory_footprint()
+                conversations.append({"session_id": session_id, "conversation_id": conversation_id, **footprint})
+                for key in FOOTPRINT_KEYS:
+                    session_totals[key] += footprint[key]
+            sessions.append(session_totals)
+            totals["sessions"] += 1
+            totals["conversations"] += session_totals["conversations"]
+            for key in FOOTPRINT_KEYS:
+                totals[key] += session_totals[key]
+        
+        by_size = lambda entry: entry["estimated_bytes"]
+        return {
+            "total": totals,
+            "sessions": heapq.nlargest(max_sessions, sessions, key=by_size),
+            "top_conversations": heapq.nlargest(top_conversations, conversations, key=by_size)
+        }
+    
     def delete_session(self, session_id: str) -> bool:
         if session_id in self._sessions:
             del self._sessions[session_id]
-            logger.info(f"Deleted session: {session_id}")
+            usage_tracker.forget_session(session_id)
+            logger.info("Deleted session: %s", session_id)
             return True
-        logger.warning(f"Attempted to delete non-existent session: {session_id}")
+        logger.warning("Attempted to delete non-existent session: %s", session_id)
         return False
 
 
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from backend.agents.data_sources import MENU_CATEGORIES
+from backend.agents.tool_runtime import prefetch_tool
+from backend.core import get_logger, get_metrics, get_settings
+from backend.models import ReservationSlots
+
+logger = get_logger("speculation")
+metrics = get_metrics()
+settings = get_settings()
+
+PrefetchCall = Tuple[str, Tuple[Any, ...]]
+
+POPULAR_TIMES = ("19:00", "18:00", "20:00")
+POPULAR_PARTY_SIZES = (2, 4, 3, 1, 5, 6)
+DEFAULT_PARTY_SIZE = 2
+AVAILABILITY_DAYS_AHEAD = 3
+
+
+def predict_calls(actions: Iterable[str], reservation: ReservationSlots) -> List[PrefetchCall]:
+    """Tool calls the next turn is likely to make, most likely first, given the buttons/widgets just offered."""
+    calls: List[PrefetchCall] = []
+    for action in actions:
+        if action == "select_party_size" and reservation.date and reservation.time:
+            calls += [("check_availability", (reservation.date, reservation.time, size)) for size in POPULAR_PARTY_SIZES]
+        elif action == "select_time" and reservation.date:
+            calls += [("check_availability", (reservation.date, t, DEFAULT_PARTY_SIZE)) for t in POPULAR_TIMES]
+        elif action in ("select_date", "make_reservation"):
+            today = date.today()
+            calls += [
+                ("check_availability", ((today + timedelta(days=d)).isoformat(), POPULAR_TIMES[0], DEFAULT_PARTY_SIZE))
+                for d in range(1, AVAILABILITY_DAYS_AHEAD + 1)
+            ]
+        elif action == "find_restaurants":
+            calls += [("get_location_and_contact", ())]
+        elif action == "view_offers":
+            calls += [("get_special_offers", ())]
+        elif action == "browse_menu":
+            calls += [("get_menu", (category,)) for category in MENU_CATEGORIES]
+    return list(dict.fromkeys(calls))
+
+
+class Speculator:
+    """Warms likely next tool results in the background, after the response is out and within a budget.
+    
+    Speculation is sequential per conversation, shares a small global concurrency limit, is skipped
+    rather than queued when that limit is reached, and is cancelled when the conversation moves on.
+    """
+    
+    def __init__(self, enabled: bool, max_calls: int, max_concurrency: int, delay_seconds: float):
+        self.enabled = enabled
+        self.max_calls = max_calls
+        self.delay_seconds = delay_seconds
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    def schedule(self, conversation_id: str, buttons: Optional[List[Dict[str, Any]]], reservation: ReservationSlots):
+        if not self.enabled or not buttons:
+            return
+        calls = predict_calls((button["action"] for button in buttons), reservation)[:self.max_calls]
+        if not calls:
+            return
+        
+        self.cancel(conversation_id)
+        task = asyncio.create_task(self._run(conversation_id, calls))
+        self._tasks[conversation_id] = task
+        task.add_done_callback(lambda done: self._tasks.pop(conversation_id, None) if self._tasks.get(conversation_id) is done else None)
+    
+    def cancel(self, conversation_id: str):
+        task = self._tasks.pop(conversation_id, None)
+        if task and not task.done():
+            task.cancel()
+            metrics.increment("speculation.cancelled")
+    
+    async def shutdown(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _run(self, conversation_id: str, calls: List[PrefetchCall]):
+        # Let the response that triggered us go out before doing any speculative work
+        await asyncio.sleep(self.delay_seconds)
+        for name, args in calls:
+            if self._slots.locked():
+                metrics.increment("speculation.skipped_busy")
+                return
+            async with self._slots:
+                try:
+                    await prefetch_tool(name, *args)
+                except Exception as e:
+                    metrics.increment("speculation.errors")
+                    logger.debug("Prefetch of %s failed for %s: %s", name, conversation_id, e)
+
+
+speculator = Speculator(
+    enabled=settings.speculation_enabled,
+    max_calls=settings.speculation_max_calls_per_turn,
+    max_concurrency=settings.speculation_max_concurrency,
+    delay_seconds=settings.speculation_delay_seconds
+)
@@ -0,0 +1,102 @@
+from typing import Dict, List, Optional
+from agents import RunHooks
+from backend.core.tracing import Span, get_tracer
+
+tracer = get_tracer()
+
+
+class TraceHooks(RunHooks):
+    """Turns a run's agent steps, LLM calls, handoffs and tool calls into spans under the run span."""
+    
+    def __init__(self, parent: Optional[Span], label: str = ""):
+        self.parent = parent
+        self.label = label
+        self._agents: Dict[str, Span] = {}
+        self._llm: Dict[str, Span] = {}
+        self._tools: Dict[str, Span] = {}
+        self._handoff: Optional[Span] = None
+        self._closed = False
+    
+    async def on_agent_start(self, context, agent) -> None:
+        tracer.end_span(self._handoff)
+        self._handoff = None
+        self._agents[agent.name] = self._start(f"agent {agent.name}{self.label}", kind="agent", parent=self.parent)
+    
+    async def on_agent_end(self, context, agent, output) -> None:
+        tracer.end_span(self._agents.pop(agent.name, None))
+    
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self._llm[agent.name] = self._start(
+            f"llm {agent.name}", kind="llm", parent=self._agents.get(agent.name), input_items=len(input_items)
+        )
+    
+    async def on_llm_end(self, context, agent, response) -> None:
+        span = self._llm.pop(agent.name, None)
+        if span:
+            span.attributes["output_tokens"] = response.usage.output_tokens
+        tracer.end_span(span)
+    
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        tracer.end_span(self._agents.pop(from_agent.name, None))
+        self._handoff = self._start(f"handoff {from_agent.name} -> {to_agent.name}", kind="handoff", parent=self.parent)
+    
+    async def on_tool_start(self, context, agent, tool) -> None:
+        self._tools[self._tool_key(context, tool)] = self._start(
+            f"tool {tool.name}", kind="tool", parent=self._agents.get(agent.name)
+        )
+    
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        tracer.end_span(self._tools.pop(self._tool_key(context, tool), None))
+    
+    def close(self, error: Optional[BaseException] = None):
+        """End spans the SDK never closed, e.g. when the run was cancelled or failed mid-step."""
+        for span in [*self._tools.values(), *self._llm.values(), *self._agents.values(), self._handoff]:
+            tracer.end_span(span, error)
+        self._tools.clear()
+        self._llm.clear()
+        self._agents.clear()
+        self._handoff = None
+        self._closed = True
+    
+    def _start(self, name: str, kind: str, parent: Optional[Span], **attributes) -> Optional[Span]:
+        # A cancelled run can still fire a callback or two; don't open spans for a trace that has ended.
+        return None if self._closed else tracer.start_span(name, kind=kind, parent=parent, **attributes)
+    
+    @staticmethod
+    def _tool_key(context, tool) -> str:
+        return getattr(context, "tool_call_id", None) or tool.name
+
+
+class HookGroup(RunHooks):
+    """Fans every run lifecycle callback out to several hook objects."""
+    
+    def __init__(self, *hooks: RunHooks):
+        self.hooks: List[RunHooks] = list(hooks)
+    
+    async def on_agent_start(self, context, agent) -> None:
+        for hooks in self.hooks:
+            await hooks.on_agent_start(context, agent)
+    
+    async def on_agent_end(self, context, agent, output) -> None:
+        for hooks in self.hooks:
+            await hooks.on_agent_end(context, agent, output)
+    
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        for hooks in self.hooks:
+            await hooks.on_llm_start(context, agent, system_prompt, input_items)
+    
+    async def on_llm_end(self, context, agent, response) -> None:
+        for hooks in self.hooks:
+            await hooks.on_llm_end(context, agent, response)
+    
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        for hooks in self.hooks:
+            await hooks.on_handoff(context, from_agent, to_agent)
+    
+    async def on_tool_start(self, context, agent, tool) -> None:
+        for hooks in self.hooks:
+            await hooks.on_tool_start(context, agent, tool)
+    
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        for hooks in self.hooks:
+            await hooks.on_tool_end(context, agent, tool, result)
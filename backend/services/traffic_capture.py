@@ -0,0 +1,117 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from backend.core import get_logger, get_settings, redact
+
+logger = get_logger("traffic_capture")
+settings = get_settings()
+
+
+def placeholder(length: int) -> str:
+    """Filler text of the given length, so replays send messages of the captured size."""
+    return ("lorem " * (length // 6 + 1))[:length]
+
+
+class TrafficCapture:
+    """Opt-in recorder of anonymized chat turns, with arrival and think times, for replay load tests.
+    
+    By default only the shape of a turn is kept: messages become filler of the same length and widget
+    submissions keep just their action. `verbatim` keeps the (redacted) text and submitted values instead.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool,
+        path: str,
+        verbatim: bool = False,
+        flush_every: int = 50,
+        max_message_chars: int = 2000,
+        max_tracked_conversations: int = 10000
+    ):
+        self.enabled = enabled
+        self.path = Path(path)
+        self.verbatim = verbatim
+        self.flush_every = flush_every
+        self.max_message_chars = max_message_chars
+        self.max_tracked_conversations = max_tracked_conversations
+        # A per-process key keeps ids stable within one capture but unlinkable to real sessions.
+        self._key = os.urandom(32)
+        self._started = time.monotonic()
+        self._turns: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+    
+    def record(
+        self,
+        session_id: str,
+        conversation_id: str,
+        request: Dict[str, Any],
+        status: int,
+        arrived_at: float,
+        latency_seconds: float
+    ):
+        """Record one turn; `arrived_at` is the monotonic time the request reached the handler."""
+        if not self.enabled:
+            return
+        
+        previous = self._turns.pop(conversation_id, None)
+        seq = int(previous["seq"]) + 1 if previous else 0
+        self._turns[conversation_id] = {"seq": seq, "finished_at": arrived_at + latency_seconds}
+        if len(self._turns) > self.max_tracked_conversations:
+            self._turns.popitem(last=False)
+        
+        message = request.get("message") or ""
+        widget_data = request.get("widget_data")
+        if self.verbatim:
+            message = redact(message, self.max_message_chars) if message else ""
+        else:
+            message = placeholder(min(len(message), self.max_message_chars))
+            widget_data = {"action": widget_data.get("action")} if widget_data else widget_data
+        entry = {
+            "session": self._anonymize(session_id),
+            "conversation": self._anonymize(conversation_id),
+            "seq": seq,
+            "t": round(arrived_at - self._started, 3),
+            "think_s": round(max(arrived_at - previous["finished_at"], 0), 3) if previous else None,
+            "message": message,
+            "action": request.get("action"),
+            "widget_data": widget_data,
+            "status": status,
+            "latency_ms": round(latency_seconds * 1000, 1)
+        }
+        with self._lock:
+            self._buffer.append(json.dumps(entry, ensure_ascii=False, default=str))
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+    
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("\n".join(self._buffer) + "\n")
+            logger.debug("Flushed %s captured turns to %s", len(self._buffer), self.path)
+        except OSError as e:
+            logger.warning("Dropping %s captured turns, write to %s failed: %s", len(self._buffer), self.path, e)
+        self._buffer.clear()
+    
+    def _anonymize(self, identifier: Optional[str]) -> str:
+        return hmac.new(self._key, str(identifier).encode(), hashlib.sha256).hexdigest()[:16]
+
+
+traffic_capture = TrafficCapture(
+    enabled=settings.traffic_capture_enabled,
+    path=settings.traffic_capture_path,
+    verbatim=settings.traffic_capture_verbatim
+)
@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from datetime import date
+from typing import Any, Dict, List, Optional
+from agents import RunHooks
+from backend.core import get_logger, get_metrics, get_settings
+
+logger = get_logger("usage_tracker")
+metrics = get_metrics()
+settings = get_settings()
+
+
+@dataclass
+class UsageTotals:
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    
+    @classmethod
+    def from_usage(cls, usage, model: Optional[str]) -> "UsageTotals":
+        cached = usage.input_tokens_details.cached_tokens or 0
+        pricing = settings.model_pricing.get(str(model), {})
+        cost = (
+            (usage.input_tokens - cached) * pricing.get("input", 0)
+            + cached * pricing.get("cached_input", 0)
+            + usage.output_tokens * pricing.get("output", 0)
+        ) / 1_000_000
+        return cls(usage.requests, usage.input_tokens, cached, usage.output_tokens, cost)
+    
+    def add(self, other: "UsageTotals"):
+        self.requests += other.requests
+        self.input_tokens += other.input_tokens
+        self.cached_tokens += other.cached_tokens
+        self.output_tokens += other.output_tokens
+        self.cost_usd += other.cost_usd
+    
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["cost_usd"] = round(self.cost_usd, 6)
+        data["cached_ratio"] = round(self.cached_tokens / self.input_tokens, 4) if self.input_tokens else 0.0
+        return data
+
+
+class UsageHooks(RunHooks):
+    """Collects per-agent usage, the model tier of each step and the handoff chain of a single run."""
+    
+    def __init__(self, model_override: Optional[str] = None):
+        self.model_override = model_override
+        self.agents: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self.chain: List[str] = []
+        self.steps: List[Dict[str, Any]] = []
+        self._llm_started: Dict[str, float] = {}
+    
+    async def on_agent_start(self, context, agent) -> None:
+        self.chain.append(agent.name)
+    
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self._llm_started[agent.name] = time.monotonic()
+    
+    async def on_llm_end(self, context, agent, response) -> None:
+        model = self.model_override or str(agent.model)
+        started = self._llm_started.pop(agent.name, time.monotonic())
+        self.agents[agent.name].add(UsageTotals.from_usage(response.usage, model))
+        self.steps.append({
+            "agent": agent.name,
+            "model": model,
+            "tier": settings.model_tier(model),
+            "latency_ms": round((time.monotonic() - started) * 1000),
+            "output_tokens": response.usage.output_tokens
+        })
+    
+    def merge(self, other: "UsageHooks", suffix: str = ""):
+        """Fold in usage from a parallel run (e.g. a hedge) so it is still paid for in the totals."""
+        for agent_name, totals in other.agents.items():
+            self.agents[f"{agent_name}{suffix}"].add(totals)
+        self.steps.extend({**step, "agent": f"{step['agent']}{suffix}"} for step in other.steps)
+
+
+class UsageTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_session: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self._by_conversation: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self._by_agent: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self._by_day: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self._by_chain: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self._conversation_sessions: Dict[str, str] = {}
+    
+    def record(self, session_id: str, conversation_id: str, hooks: UsageHooks) -> Dict[str, Any]:
+        """Aggregate one run's usage and return the per-turn breakdown stored on the message."""
+        turn = UsageTotals()
+        for totals in hooks.agents.values():
+            turn.add(totals)
+        chain = ">".join(hooks.chain)
+        
+        with self._lock:
+            self._conversation_sessions[conversation_id] = session_id
+            for bucket, key in (
+                (self._by_session, session_id),
+                (self._by_conversation, conversation_id),
+                (self._by_day, date.today().isoformat()),
+                (self._by_chain, chain)
+            ):
+                bucket[key].add(turn)
+            for agent_name, totals in hooks.agents.items():
+                self._by_agent[agent_name].add(totals)
+        
+        metrics.increment("tokens.input", turn.input_tokens)
+        metrics.increment("tokens.cached", turn.cached_tokens)
+        metrics.increment("tokens.output", turn.output_tokens)
+        metrics.increment("tokens.cost_usd", turn.cost_usd)
+        steps = " ".join(f"{step['agent']}[{step['tier']}:{step['model']} {step['latency_ms']}ms]" for step in hooks.steps)
+        logger.info("Turn usage for %s: %s", conversation_id, steps, extra={"usage": turn.as_dict()})
+        
+        return {
+            **turn.as_dict(),
+            "handoff_chain": chain,
+            "steps": hooks.steps,
+            "agents": {name: totals.as_dict() for name, totals in hooks.agents.items()}
+        }
+    
+    def forget_session(self, session_id: str):
+        """Drop a deleted session's per-session and per-conversation totals; global, agent and day totals stay."""
+        with self._lock:
+            self._by_session.pop(session_id, None)
+            for conversation_id in [cid for cid, sid in self._conversation_sessions.items() if sid == session_id]:
+                del self._conversation_sessions[conversation_id]
+                self._by_conversation.pop(conversation_id, None)
+    
+    def conversation_usage(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        totals = self._by_conversation.get(conversation_id)
+        return totals.as_dict() if totals else None
+    
+    def session_usage(self, session_id: str) -> Optional[Dict[str, Any]]:
+        totals = self._by_session.get(session_id)
+        if not totals:
+            return None
+        return {
+            **totals.as_dict(),
+            "conversations": {
+                cid: self._by_conversation[cid].as_dict()
+                for cid, sid in self._conversation_sessions.items() if sid == session_id
+            }
+        }
+    
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            total = UsageTotals()
+            for totals in self._by_day.values():
+                total.add(totals)
+            return {
+                "total": total.as_dict(),
+                "agents": {k: v.as_dict() for k, v in self._by_agent.items()},
+                "days": {k: v.as_dict() for k, v in self._by_day.items()},
+                "handoff_chains": {k: v.as_dict() for k, v in self._by_chain.items()}
+            }
+
+
+usage_tracker = UsageTracker()
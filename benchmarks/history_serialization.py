@@ -0,0 +1,58 @@
+"""Compare the per-message history serialization path with the pre-encoded buffer.
+
+Usage: python -m benchmarks.history_serialization [--messages 1000] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import timeit
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from backend.api.schemas import ConversationHistoryResponse
+from backend.models import Conversation
+
+
+def build_conversation(message_count: int) -> Conversation:
+    conversation = Conversation()
+    for i in range(message_count):
+        role = "user" if i % 2 == 0 else "assistant"
+        metadata = {"usage": {"input_tokens": 850 + i, "output_tokens": 120}} if role == "assistant" else {}
+        conversation.add_message(role, f"Message {i}: could I book a table for four on Friday evening? " * 3, metadata)
+    return conversation
+
+
+def rebuild_history(conversation: Conversation) -> bytes:
+    messages = [
+        {
+            "role": msg.role,
+            "content": msg.content,
+            "timestamp": msg.timestamp.isoformat(),
+            "metadata": msg.metadata
+        }
+        for msg in conversation.messages
+    ]
+    response = ConversationHistoryResponse(conversation_id=conversation.conversation_id, messages=messages)
+    return json.dumps(response.model_dump(mode="json"), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    
+    conversation = build_conversation(args.messages)
+    assert json.loads(rebuild_history(conversation)) == json.loads(conversation.history_json())
+    
+    rebuilt = timeit.timeit(lambda: rebuild_history(conversation), number=args.repeat) / args.repeat
+    buffered = timeit.timeit(conversation.history_json, number=args.repeat) / args.repeat
+    
+    print(f"messages={args.messages} payload={len(conversation.history_json()) / 1024:.1f} KiB")
+    print(f"rebuild per request: {rebuilt * 1000:.3f} ms")
+    print(f"buffer per request:  {buffered * 1000:.3f} ms")
+    print(f"speedup: {rebuilt / buffered:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Re-drive captured chat traffic against a running backend and report latency and errors.
+
+Unless captured with TRAFFIC_CAPTURE_VERBATIM=true, messages replay as filler of their original length and
+widget submissions without their values.
+
+Usage: python -m benchmarks.replay_traffic logs/capture/traffic.jsonl [--base-url http://localhost:8000]
+       [--speed 2] [--concurrency 50] [--limit 100] [--no-think]
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+def load_capture(path: str, limit: Optional[int]) -> List[List[Dict[str, Any]]]:
+    """Group captured turns into conversations ordered by their first arrival."""
+    conversations: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                turn = json.loads(line)
+                conversations[turn["conversation"]].append(turn)
+    ordered = sorted((sorted(turns, key=lambda turn: turn["seq"]) for turns in conversations.values()), key=lambda turns: turns[0]["t"])
+    return ordered[:limit] if limit else ordered
+
+
+def turn_kind(turn: Dict[str, Any]) -> str:
+    if turn.get("widget_data"):
+        return f"widget:{turn['widget_data'].get('action')}"
+    if turn.get("action"):
+        return f"button:{turn['action']}"
+    return "text"
+
+
+class Replayer:
+    def __init__(self, client: httpx.AsyncClient, speed: float, concurrency: int, think: bool):
+        self.client = client
+        self.speed = speed
+        self.think = think
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.sessions: Dict[str, asyncio.Task] = {}
+        self.results: List[Dict[str, Any]] = []
+    
+    async def session_for(self, captured_session: str) -> str:
+        if captured_session not in self.sessions:
+            self.sessions[captured_session] = asyncio.create_task(self._create_session())
+        return await self.sessions[captured_session]
+    
+    async def _create_session(self) -> str:
+        response = await self.client.post("/api/v1/session")
+        response.raise_for_status()
+        return response.json()["session_id"]
+    
+    async def replay(self, turns: List[Dict[str, Any]], start_offset: float):
+        await asyncio.sleep(start_offset / self.speed)
+        async with self.semaphore:
+            try:
+                session_id = await self.session_for(turns[0]["session"])
+                response = await self.client.post("/api/v1/conversation", json={"session_id": session_id})
+                response.raise_for_status()
+                conversation_id = response.json()["conversation_id"]
+            except httpx.HTTPError as e:
+                self.results.extend({"kind": turn_kind(turn), "status": type(e).__name__, "latency_ms": None} for turn in turns)
+                return
+            
+            for turn in turns:
+                if self.think and turn.get("think_s"):
+                    await asyncio.sleep(turn["think_s"] / self.speed)
+                await self._send(session_id, conversation_id, turn)
+    
+    async def _send(self, session_id: str, conversation_id: str, turn: Dict[str, Any]):
+        started = time.perf_counter()
+        try:
+            response = await self.client.post("/api/v1/chat", json={
+                "session_id": session_id,
+                "conversation_id": conversation_id,
+                "message": turn.get("message") or "",
+                "action": turn.get("action"),
+                "widget_data": turn.get("widget_data")
+            })
+            status: Any = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.results.append({
+            "kind": turn_kind(turn),
+            "status": status,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "captured_latency_ms": turn.get("latency_ms")
+        })
+
+
+def percentile(values: List[float], p: float) -> float:
+    return values[min(int(p * len(values)), len(values) - 1)] if values else 0.0
+
+
+def report(results: List[Dict[str, Any]], elapsed: float):
+    latencies = sorted(result["latency_ms"] for result in results if result["latency_ms"] is not None)
+    errors = [result for result in results if result["status"] != 200]
+    print(f"turns={len(results)} elapsed={elapsed:.1f}s throughput={len(results) / elapsed:.2f} turns/s")
+    print(f"error rate: {len(errors) / len(results) * 100 if results else 0:.2f}% {dict(Counter(str(r['status']) for r in errors))}")
+    print("latency ms: " + " ".join(f"{name}={percentile(latencies, p):.0f}" for name, p in [("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)]))
+    
+    captured = sorted(result["captured_latency_ms"] for result in results if result.get("captured_latency_ms") is not None)
+    if captured:
+        print(f"captured latency ms: p50={percentile(captured, 0.5):.0f} p95={percentile(captured, 0.95):.0f}")
+    
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        if result["latency_ms"] is not None:
+            by_kind[result["kind"]].append(result["latency_ms"])
+    for kind, values in sorted(by_kind.items(), key=lambda item: -len(item[1])):
+        values.sort()
+        print(f"  {kind:<28} n={len(values):<5} p50={percentile(values, 0.5):.0f} p95={percentile(values, 0.95):.0f}")
+
+
+async def run(args: argparse.Namespace):
+    conversations = load_capture(args.capture, args.limit)
+    if not conversations:
+        print("No captured turns found")
+        return
+    
+    origin = conversations[0][0]["t"]
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        replayer = Replayer(client, args.speed, args.concurrency, think=not args.no_think)
+        print(f"Replaying {len(conversations)} conversations at {args.speed}x with concurrency {args.concurrency}")
+        started = time.perf_counter()
+        await asyncio.gather(*(replayer.replay(turns, turns[0]["t"] - origin) for turns in conversations))
+        report(replayer.results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="JSONL file written by the backend with TRAFFIC_CAPTURE_ENABLED=true")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="time scaling, e.g. 2 or 10 replays faster")
+    parser.add_argument("--concurrency", type=int, default=50, help="max conversations in flight")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N conversations")
+    parser.add_argument("--no-think", action="store_true", help="send each turn as soon as the previous one returns")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compare per-turn model payload and handler latency for the transcript and session run-state modes.
+
+Usage: python -m benchmarks.run_state_modes [--conversations 20] [--turns 40] [--reply-chars 400] [--ms-per-kb 0]
+
+The model is an in-process stand-in that keeps responses by id the way the Responses API does, so the
+numbers isolate what the backend sends per turn; --ms-per-kb adds simulated upload/parse time per KB.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from agents import Model, ModelProvider, ModelResponse, Usage, set_tracing_disabled
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+from backend.api.chat_handler import chat_handler
+from backend.api.schemas import ChatRequest
+from backend.core import get_settings
+from backend.services import agent_runner, session_manager, speculator
+
+settings = get_settings()
+
+USER_MESSAGES = [
+    "Do you have anything vegan on the menu?",
+    "What time do you close on Saturdays?",
+    "Is there parking near the downtown location?",
+    "Can you tell me about the weekend special?",
+    "How spicy is the pasta carbonara?"
+]
+
+
+class StubModel(Model):
+    """Replies instantly and records how many bytes each request carried."""
+    
+    def __init__(self, reply_chars: int, ms_per_kb: float, requests: List[int], responses: Dict[str, int]):
+        self.reply = ("Happy to help with that. " * (reply_chars // 25 + 1))[:reply_chars]
+        self.ms_per_kb = ms_per_kb
+        self.requests = requests
+        self.responses = responses
+    
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *,
+                           previous_response_id=None, conversation_id=None, prompt=None):
+        if previous_response_id is not None and previous_response_id not in self.responses:
+            raise KeyError(f"unknown previous response {previous_response_id}")
+        payload = len(json.dumps({"instructions": system_instructions, "input": input}, default=str))
+        self.requests.append(payload)
+        if self.ms_per_kb:
+            await asyncio.sleep(payload / 1024 * self.ms_per_kb / 1000)
+        
+        response_id = f"resp_{uuid.uuid4().hex}"
+        self.responses[response_id] = payload
+        message = ResponseOutputMessage(
+            id=f"msg_{uuid.uuid4().hex[:12]}", type="message", role="assistant", status="completed",
+            content=[ResponseOutputText(type="output_text", text=self.reply, annotations=[])]
+        )
+        usage = Usage(
+            requests=1, input_tokens=payload // 4, output_tokens=len(self.reply) // 4, total_tokens=0,
+            input_tokens_details=InputTokensDetails(cached_tokens=0), output_tokens_details=OutputTokensDetails(reasoning_tokens=0)
+        )
+        return ModelResponse(output=[message], usage=usage, response_id=response_id)
+    
+    def stream_response(self, *args, **kwargs):
+        # Model declares this abstract; the benchmark only drives Runner.run, which never streams
+        raise NotImplementedError("StubModel only serves non-streamed runs; use Runner.run, not Runner.run_streamed")
+
+
+class StubProvider(ModelProvider):
+    def __init__(self, model: StubModel):
+        self.model = model
+    
+    def get_model(self, model_name):
+        return self.model
+
+
+async def run_conversation(turns: int, requests: List[int], results: Dict[int, List[Dict[str, float]]]):
+    session_id = session_manager.create_session()
+    conversation_id = chat_handler.open_conversation(session_id).conversation_id
+    for turn in range(1, turns + 1):
+        before = len(requests)
+        started = time.perf_counter()
+        await chat_handler.handle(ChatRequest(
+            session_id=session_id,
+            conversation_id=conversation_id,
+            message=USER_MESSAGES[turn % len(USER_MESSAGES)]
+        ))
+        results[turn].append({
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "payload_bytes": sum(requests[before:])
+        })
+    session_manager.delete_session(session_id)
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> Dict[int, List[Dict[str, float]]]:
+    settings.run_state_mode = mode
+    requests: List[int] = []
+    agent_runner.use_model_provider(StubProvider(StubModel(args.reply_chars, args.ms_per_kb, requests, {})))
+    results: Dict[int, List[Dict[str, float]]] = defaultdict(list)
+    # Conversations run one at a time so payload bytes per turn are attributed exactly
+    for _ in range(args.conversations):
+        await run_conversation(args.turns, requests, results)
+    return results
+
+
+def mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def report(all_results: Dict[str, Dict[int, List[Dict[str, float]]]], turns: int):
+    checkpoints = sorted({1, 5, 10, 20, 40, turns} & set(range(1, turns + 1)))
+    modes = list(all_results)
+    print(f"{'turn':>6} " + " ".join(f"{mode + ' KB':>14} {mode + ' ms':>14}" for mode in modes))
+    for turn in checkpoints:
+        cells = []
+        for mode in modes:
+            samples = all_results[mode][turn]
+            cells.append(f"{mean([s['payload_bytes'] for s in samples]) / 1024:>14.1f} {mean([s['latency_ms'] for s in samples]):>14.2f}")
+        print(f"{turn:>6} " + " ".join(cells))
+    for mode in modes:
+        samples = [sample for per_turn in all_results[mode].values() for sample in per_turn]
+        total_kb = sum(sample["payload_bytes"] for sample in samples) / 1024
+        print(f"{mode}: total {total_kb:.0f} KB sent, mean turn latency {mean([s['latency_ms'] for s in samples]):.2f} ms")
+
+
+async def run(args: argparse.Namespace):
+    set_tracing_disabled(True)
+    speculator.enabled = False
+    all_results = {mode: await run_mode(mode, args) for mode in ("transcript", "session")}
+    print(f"{args.conversations} conversations x {args.turns} turns, reply {args.reply_chars} chars, {args.ms_per_kb} ms/KB")
+    report(all_results, args.turns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--reply-chars", type=int, default=400, help="length of each stubbed assistant reply")
+    parser.add_argument("--ms-per-kb", type=float, default=0.0, help="simulated model-side cost per KB of request")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
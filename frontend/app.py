@@ -1,5 +1,8 @@
+import json
+import time
 import streamlit as st
-from frontend.services import api_client
+from uuid import uuid4
+from frontend.services import api_client, ChatSocket, trace_headers
 from frontend.core import get_frontend_logger, get_frontend_settings
 
 logger = get_frontend_logger("app")
@@ -30,6 +33,12 @@ def initialize_session_state():
     
     if "current_buttons" not in st.session_state:
         st.session_state.current_buttons = []
+    
+    if "chat_socket" not in st.session_state:
+        st.session_state.chat_socket = None
+    
+    if "pending_turn" not in st.session_state:
+        st.session_state.pending_turn = None
 
 
 def check_backend_health():
@@ -37,8 +46,48 @@ def check_backend_health():
     return api_client.health_check()
 
 
+def open_chat_socket(session_id: str = None, conversation_id: str = None):
+    if not settings.use_websocket:
+        return None
+    
+    if st.session_state.chat_socket:
+        st.session_state.chat_socket.close()
+    
+    chat_socket = ChatSocket()
+    connection_data = chat_socket.connect(session_id, conversation_id)
+    st.session_state.chat_socket = chat_socket if connection_data else None
+    return connection_data
+
+
+def ensure_chat_socket():
+    chat_socket = st.session_state.chat_socket
+    if chat_socket and chat_socket.connected:
+        return chat_socket
+    
+    if settings.use_websocket and open_chat_socket(st.session_state.session_id, st.session_state.conversation_id):
+        for event in st.session_state.chat_socket.drain_events():
+            if event.get("type") == "return_greeting":
+                st.session_state.messages.append({"role": "assistant", "content": event["message"]})
+        return st.session_state.chat_socket
+    return None
+
+
 def create_new_session():
     logger.info("Creating new session from UI")
+    connection_data = open_chat_socket()
+    if connection_data:
+        st.session_state.session_id = connection_data["session_id"]
+        st.session_state.conversation_id = connection_data["conversation_id"]
+        st.session_state.messages = [
+            {
+                "role": "assistant",
+                "content": connection_data["initial_message"]
+            }
+        ]
+        st.session_state.current_buttons = connection_data.get("buttons", [])
+        logger.info(f"New session created over WebSocket: {connection_data['session_id']}")
+        return True
+    
     session_id = api_client.create_session()
     if session_id:
         st.session_state.session_id = session_id
@@ -58,6 +107,17 @@ def create_new_session():
     return False
 
 
+def get_turn_key(user_message: str, action: str = None, widget_data: dict = None) -> str:
+    """Reuse the idempotency key of an unanswered identical turn so reruns and retries never run twice."""
+    fingerprint = json.dumps([user_message, action, widget_data], sort_keys=True)
+    pending_turn = st.session_state.pending_turn
+    if pending_turn and pending_turn["fingerprint"] == fingerprint:
+        return pending_turn["key"]
+    
+    st.session_state.pending_turn = {"fingerprint": fingerprint, "key": str(uuid4())}
+    return st.session_state.pending_turn["key"]
+
+
 def send_message(user_message: str, action: str = None, widget_data: dict = None):
     if not st.session_state.session_id or not st.session_state.conversation_id:
         logger.warning("Attempted to send message without session/conversation")
@@ -68,16 +128,32 @@ def send_message(user_message: str, action: str = None, widget_data: dict = None
     st.session_state.current_buttons = []
     logger.info(f"User message added: {user_message[:50]}...")
     
+    turn_key = get_turn_key(user_message, action, widget_data)
+    trace = trace_headers(st.session_state.rerun_started_at)
+    
     with st.spinner("Thinking..."):
-        response_data = api_client.send_message(
-            st.session_state.session_id,
-            st.session_state.conversation_id,
-            user_message,
-            action=action,
-            widget_data=widget_data
-        )
+        chat_socket = ensure_chat_socket()
+        if chat_socket:
+            response_data = chat_socket.send_message(
+                user_message,
+                action=action,
+                widget_data=widget_data,
+                idempotency_key=turn_key,
+                trace=trace
+            )
+        else:
+            response_data = api_client.send_message(
+                st.session_state.session_id,
+                st.session_state.conversation_id,
+                user_message,
+                action=action,
+                widget_data=widget_data,
+                idempotency_key=turn_key,
+                trace=trace
+            )
     
     if response_data:
+        st.session_state.pending_turn = None
         st.session_state.messages.append({
             "role": "assistant",
             "content": response_data["response"]
@@ -91,6 +167,8 @@ def send_message(user_message: str, action: str = None, widget_data: dict = None
 
 def main():
     logger.info("Starting Streamlit app")
+    # Sent with each turn so backend traces show how long the rerun took before the request left.
+    st.session_state.rerun_started_at = time.time()
     initialize_session_state()
     
     st.title("🍽️ Restaurant Chat Agent")
@@ -7,6 +7,11 @@ class FrontendSettings(BaseSettings):
     frontend_host: str = "localhost"
     frontend_port: int = 8501
     log_level: str = "DEBUG"
+    use_websocket: bool = True
+    request_timeout_seconds: float = 60.0
+    chat_retries: int = 2
+    ws_open_timeout_seconds: float = 10.0
+    ws_response_timeout_seconds: float = 120.0
     
     class Config:
         env_file = ".env"
@@ -1,4 +1,5 @@
 from .api_client import api_client
+from .ws_client import ChatSocket
+from .tracing import trace_headers
 
-__all__ = ["api_client"]
-
+__all__ = ["api_client", "ChatSocket", "trace_headers"]
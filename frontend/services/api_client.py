@@ -1,4 +1,5 @@
 import requests
+from uuid import uuid4
 from typing import Dict, Any, List, Optional
 from frontend.core import get_frontend_settings, get_frontend_logger
 
@@ -11,16 +12,21 @@ class APIClient:
         self.base_url = settings.backend_api_url
         logger.info(f"APIClient initialized with base URL: {self.base_url}")
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict[str, Any]]:
+    def _make_request(self, method: str, endpoint: str, retries: int = 0, **kwargs) -> Optional[Dict[str, Any]]:
         url = f"{self.base_url}{endpoint}"
-        try:
-            logger.debug(f"{method} request to {url}")
-            response = requests.request(method, url, **kwargs)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
-            return None
+        for attempt in range(retries + 1):
+            try:
+                logger.debug(f"{method} request to {url} (attempt {attempt + 1})")
+                response = requests.request(method, url, timeout=settings.request_timeout_seconds, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                logger.warning(f"API request attempt {attempt + 1} failed: {str(e)}")
+            except requests.exceptions.RequestException as e:
+                logger.error(f"API request failed: {str(e)}")
+                return None
+        logger.error(f"API request failed after {retries + 1} attempts: {url}")
+        return None
     
     def health_check(self) -> bool:
         response = self._make_request("GET", "/api/v1/health")
@@ -54,12 +60,16 @@ class APIClient:
         message: str,
         metadata: Optional[Dict[str, Any]] = None,
         action: Optional[str] = None,
-        widget_data: Optional[Dict[str, Any]] = None
+        widget_data: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+        trace: Optional[Dict[str, str]] = None
     ) -> Optional[Dict[str, Any]]:
         logger.info(f"Sending message in conversation: {conversation_id}")
         response = self._make_request(
             "POST",
             "/api/v1/chat",
+            retries=settings.chat_retries,
+            headers={"Idempotency-Key": idempotency_key or str(uuid4()), **(trace or {})},
             json={
                 "session_id": session_id,
                 "conversation_id": conversation_id,
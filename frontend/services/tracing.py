@@ -0,0 +1,11 @@
+import os
+import time
+from typing import Dict, Optional
+
+
+def trace_headers(started_at: Optional[float] = None) -> Dict[str, str]:
+    """W3C trace context for one chat turn; tracestate carries when the turn started on the client."""
+    return {
+        "traceparent": f"00-{os.urandom(16).hex()}-{os.urandom(8).hex()}-01",
+        "tracestate": f"rchat={int((started_at or time.time()) * 1000)}"
+    }
@@ -0,0 +1,122 @@
+import itertools
+import json
+import queue
+import threading
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlencode
+from websockets.exceptions import ConnectionClosed, WebSocketException
+from websockets.sync.client import connect
+from frontend.core import get_frontend_settings, get_frontend_logger
+
+logger = get_frontend_logger("ws_client")
+settings = get_frontend_settings()
+
+
+class ChatSocket:
+    """Persistent chat channel: one handshake for session and conversation, then multiplexed turns."""
+    
+    def __init__(self):
+        self.ws_url = settings.backend_api_url.replace("http", "ws", 1) + "/api/v1/ws"
+        self.session_id: Optional[str] = None
+        self.conversation_id: Optional[str] = None
+        self._connection = None
+        self._pending: Dict[str, queue.Queue] = {}
+        self._events: queue.Queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._closed = threading.Event()
+    
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._closed.is_set()
+    
+    def connect(self, session_id: Optional[str] = None, conversation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        params = {k: v for k, v in {"session_id": session_id, "conversation_id": conversation_id}.items() if v}
+        url = f"{self.ws_url}?{urlencode(params)}" if params else self.ws_url
+        try:
+            self._connection = connect(url, open_timeout=settings.ws_open_timeout_seconds)
+            session = json.loads(self._connection.recv(timeout=settings.ws_open_timeout_seconds))
+            if session.get("type") != "session":
+                logger.error(f"WebSocket handshake failed: {session}")
+                self._connection.close()
+                return None
+            
+            result = dict(session)
+            if not session.get("resumed"):
+                greeting = json.loads(self._connection.recv(timeout=settings.ws_open_timeout_seconds))
+                result["initial_message"] = greeting.get("message")
+                result["buttons"] = greeting.get("buttons", [])
+        except (OSError, TimeoutError, WebSocketException) as e:
+            logger.error(f"WebSocket connection failed: {str(e)}")
+            self._connection = None
+            return None
+        
+        self.session_id = result["session_id"]
+        self.conversation_id = result["conversation_id"]
+        self._closed.clear()
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        logger.info(f"WebSocket connected for conversation: {self.conversation_id}")
+        return result
+    
+    def _read_loop(self):
+        try:
+            for raw_frame in self._connection:
+                frame = json.loads(raw_frame)
+                frame_type = frame.get("type")
+                if frame_type == "ping":
+                    self._connection.send(json.dumps({"type": "pong"}))
+                elif frame.get("id") in self._pending:
+                    self._pending[frame["id"]].put(frame)
+                else:
+                    self._events.put(frame)
+        except ConnectionClosed as e:
+            logger.warning(f"WebSocket closed: {str(e)}")
+        finally:
+            self._closed.set()
+            for waiter in list(self._pending.values()):
+                waiter.put(None)
+    
+    def send_message(
+        self,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        action: Optional[str] = None,
+        widget_data: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+        trace: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        frame_id = str(next(self._ids))
+        waiter: queue.Queue = queue.Queue()
+        self._pending[frame_id] = waiter
+        try:
+            self._connection.send(json.dumps({
+                "type": "widget" if widget_data else "chat",
+                "id": frame_id,
+                "message": message,
+                "metadata": metadata or {},
+                "action": action,
+                "widget_data": widget_data,
+                "idempotency_key": idempotency_key,
+                **(trace or {})
+            }))
+            frame = waiter.get(timeout=settings.ws_response_timeout_seconds)
+        except (ConnectionClosed, queue.Empty) as e:
+            logger.error(f"WebSocket turn failed: {type(e).__name__}")
+            return None
+        finally:
+            self._pending.pop(frame_id, None)
+        
+        if not frame or frame.get("type") == "error":
+            logger.error(f"WebSocket turn returned error: {frame}")
+            return None
+        return frame
+    
+    def drain_events(self) -> List[Dict[str, Any]]:
+        events = []
+        while not self._events.empty():
+            events.append(self._events.get_nowait())
+        return events
+    
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+        self._closed.set()
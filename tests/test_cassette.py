@@ -0,0 +1,68 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from agents import Model, ModelProvider, ModelResponse, ModelSettings, Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from backend.services.cassette import Cassette, request_keys
+
+
+class StubModel(Model):
+    def __init__(self):
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        self.calls += 1
+        message = ResponseOutputMessage(
+            id="msg_1", type="message", role="assistant", status="completed",
+            content=[ResponseOutputText(type="output_text", text=f"reply {self.calls}", annotations=[])]
+        )
+        usage = Usage(requests=1, input_tokens=12, output_tokens=3, total_tokens=15)
+        return ModelResponse(output=[message], usage=usage, response_id=f"resp_{self.calls}")
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("StubModel only serves non-streamed calls")
+
+
+class StubProvider(ModelProvider):
+    def __init__(self):
+        self.model = StubModel()
+
+    def get_model(self, model_name):
+        return self.model
+
+
+def keys(input="hello", temperature=0.2, previous_response_id=None):
+    return request_keys("gpt-test", "Be brief.", ModelSettings(temperature=temperature), [], None, [], input, previous_response_id)
+
+
+def test_request_keys_are_stable_and_cover_the_request():
+    assert keys() == keys()
+    assert keys("hello") == keys([{"role": "user", "content": "hello"}])
+    assert keys(temperature=0.7)["key"] != keys()["key"]
+    assert keys(temperature=0.7)["loose_key"] == keys()["loose_key"]
+    assert keys(previous_response_id="resp_1")["key"] != keys()["key"]
+
+
+def test_recorded_calls_replay_in_order(tmp_path):
+    async def call(provider: ModelProvider, input: str) -> ModelResponse:
+        return await provider.get_model("gpt-test").get_response(
+            "Be brief.", input, ModelSettings(), [], None, [], None
+        )
+
+    async def scenario():
+        path = str(tmp_path / "calls.jsonl")
+        provider = StubProvider()
+        recorder = Cassette("record", path, "zero").wrap(provider)
+        recorded = [await call(recorder, "hello"), await call(recorder, "hello")]
+
+        player = Cassette("replay", path, "zero").wrap(StubProvider())
+        replayed = [await call(player, "hello"), await call(player, "hello"), await call(player, "hello")]
+
+        assert provider.model.calls == 2
+        assert [response.response_id for response in replayed] == ["resp_1", "resp_2", "resp_2"]
+        assert replayed[0].output == recorded[0].output
+        assert replayed[0].usage.total_tokens == 15
+
+    asyncio.run(scenario())
@@ -0,0 +1,33 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from backend.services.idempotency import IdempotencyCache
+
+
+def test_duplicate_reruns_producer_when_original_is_cancelled():
+    async def scenario():
+        cache = IdempotencyCache(ttl_seconds=60, max_entries=10)
+        started = asyncio.Event()
+        calls = []
+
+        async def producer() -> bytes:
+            calls.append(len(calls))
+            if len(calls) == 1:
+                started.set()
+                await asyncio.sleep(10)
+            return b"body"
+
+        original = asyncio.create_task(cache.run("conversation", "key", producer))
+        await started.wait()
+        duplicate = asyncio.create_task(cache.run("conversation", "key", producer))
+        await asyncio.sleep(0)
+        original.cancel()
+
+        assert await duplicate == (b"body", False)
+        assert original.cancelled()
+        assert len(calls) == 2
+        assert await cache.run("conversation", "key", producer) == (b"body", True)
+
+    asyncio.run(scenario())
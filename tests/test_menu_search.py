@@ -0,0 +1,17 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from backend.agents.menu_search import menu_index
+
+
+def names(query: str):
+    return [item.name for item, _ in menu_index.search(query, limit=20)]
+
+
+def test_allergen_phrases_exclude_rather_than_match():
+    assert "Calamari" not in names("no shellfish")
+    assert "Caesar Salad" not in names("without fish or egg")
+    assert not {"Tiramisu", "Chocolate Lava Cake", "Panna Cotta"} & set(names("dairy free dessert"))
+    assert names("vegan gluten-free") == ["Cocktails", "Wine"]
+    assert names("shellfish") == ["Calamari"]